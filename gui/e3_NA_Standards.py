@@ -12,24 +12,25 @@ Author: Jonathan Callahan
 Date: 2025-07-11
 """
 
+import collections
+import importlib
+import itertools
 import logging
 import os
+import queue
 import sys
 import threading
+import time
 import tkinter as tk
-from tkinter import messagebox, scrolledtext
+from collections.abc import Mapping
+from operator import itemgetter
+from tkinter import filedialog, messagebox
 
 import customtkinter as ctk
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
-    from lib.e3_device_designation import run_device_designation_automation
-    from lib.e3_terminal_pin_names import run_terminal_pin_name_automation
-    from lib.e3_wire_core_sync import WireCoreSynchronizer
-    from lib.e3_wire_numbering import run_wire_number_automation
-    from lib.e3_field_connection import run_field_connection_automation
-    from lib.e3_panel_path_levels import run_panel_path_level_automation
     from lib.e3_selector_widget import E3SelectorWidget
 except ImportError as exc:
     print(f"Error importing required modules: {exc}")
@@ -49,43 +50,262 @@ except ImportError:
         ctk.set_default_color_theme("blue")
 
 
+# ---------------------------------------------------------------------------
+# Lazily imported automation modules
+#
+# The lib.e3_* modules pull in e3series/pywin32 COM machinery. They are only
+# imported the first time an operation runs (on the worker thread), so the
+# window does not pay for them at start-up.
+# ---------------------------------------------------------------------------
+
+_lib_attrs = {}
+
+
+def _load_lib_attr(module_name: str, attr: str):
+    """Import lib.<module_name> on first use and return its <attr>."""
+    key = (module_name, attr)
+    value = _lib_attrs.get(key)
+    if value is None:
+        module = importlib.import_module(f"lib.{module_name}")
+        value = _lib_attrs[key] = getattr(module, attr)
+    return value
+
+
+def _lazy_operation(module_name: str, func_name: str):
+    """Return a (logger, pid) -> bool operation that resolves its module on first call."""
+    def operation(logger, pid, **kwargs):
+        return _load_lib_attr(module_name, func_name)(logger, pid, **kwargs)
+    operation.__name__ = func_name
+    return operation
+
+
+run_device_designation_automation = _lazy_operation(
+    "e3_device_designation", "run_device_designation_automation")
+run_terminal_pin_name_automation = _lazy_operation(
+    "e3_terminal_pin_names", "run_terminal_pin_name_automation")
+run_wire_number_automation = _lazy_operation(
+    "e3_wire_numbering", "run_wire_number_automation")
+run_field_connection_automation = _lazy_operation(
+    "e3_field_connection", "run_field_connection_automation")
+run_panel_path_level_automation = _lazy_operation(
+    "e3_panel_path_levels", "run_panel_path_level_automation")
+
+
+# Nothing in this app's log lines uses caller, thread or process info, so stop
+# logging from collecting it for every record
+logging._srcfile = None
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+# Only used for tracebacks; regular lines are built by LogHandler.format
+_exc_formatter = logging.Formatter()
+
+
 class LogHandler(logging.Handler):
-    """Routes log records into a ScrolledText widget on the main thread."""
+    """Buffers log records and drains them into a Text widget on a Tk timer.
+
+    Worker threads only append to a bounded deque (atomic under the GIL); the
+    main thread drains it every DRAIN_INTERVAL_MS with one Tcl call that
+    inserts, trims and (if the view was already there) scrolls to the end.
+    The widget keeps at most ``max_lines`` lines; older lines are trimmed.
+    """
+
+    DRAIN_INTERVAL_MS = 50
+    MAX_BATCH = 512
+    FOLLOW_THRESHOLD = 0.98   # yview bottom fraction that counts as "at the end"
+
+    # Each line is tagged with its level name; only these levels get a colour
+    LEVEL_COLORS = {
+        "DEBUG": "#AAAAAA",
+        "WARNING": "#FFA500",
+        "ERROR": "#FF5555",
+        "CRITICAL": "#FF5555",
+    }
+
+    # Insert, trim to max lines and follow the end in one Tcl call per drain.
+    # Only scroll if the view was already at the bottom before the insert.
+    # args is a flat list of text/tag pairs, one pair per run of same-level lines.
+    APPEND_PROC = "e3_log_append"
+    _APPEND_PROC_SRC = """
+proc e3_log_append {w maxlines threshold args} {
+    set follow [expr {[lindex [$w yview] 1] >= $threshold}]
+    $w configure -state normal
+    $w insert end {*}$args
+    set end [lindex [split [$w index end-1c] .] 0]
+    if {$end > $maxlines} {
+        $w delete 1.0 [expr {$end - $maxlines}].0
+    }
+    $w configure -state disabled
+    if {$follow} {
+        $w see end
+    }
+}
+"""
 
-    def __init__(self, text_widget):
+    def __init__(self, text_widget, max_lines: int = 2000, maxlen: int = 4096, history=None):
         super().__init__()
         self.text_widget = text_widget
+        self.max_lines = max_lines
+        self._queue = collections.deque(maxlen=maxlen)
+        # Optional bounded deque that keeps every line, independent of the widget
+        self._history = history
+        self._widget_path = None
+        self._closed = False
+        self._last_second = None
+        self._last_stamp = ""
+
+    def format(self, record):
+        """Build "HH:MM:SS - LEVEL - message" without going through logging.Formatter."""
+        return self._line(record.created, record.levelname, record.getMessage(), record.exc_info)
 
     def emit(self, record):
         try:
-            msg = self.format(record)
-            self.text_widget.after(0, self._append, msg)
+            self._push(record.levelname, self.format(record))
         except Exception:
             self.handleError(record)
 
-    def _append(self, msg):
+    def post(self, levelno: int, message: str, exc_info=None):
+        """Queue a message directly, without a LogRecord (used by GuiLogger)."""
+        levelname = logging.getLevelName(levelno)
+        self._push(levelname, self._line(time.time(), levelname, message, exc_info))
+
+    def _push(self, levelname, line):
+        self._queue.append((levelname, line))
+        if self._history is not None:
+            self._history.append(line)
+
+    def _line(self, created, levelname, message, exc_info=None):
+        # The timestamp string is reused for every line logged within the same second
+        second = int(created)
+        if second != self._last_second:
+            self._last_second = second
+            self._last_stamp = time.strftime("%H:%M:%S", time.localtime(second))
+        line = f"{self._last_stamp} - {levelname} - {message}"
+        if exc_info:
+            line = f"{line}\n{_exc_formatter.formatException(exc_info)}"
+        return line
+
+    def start(self):
+        """Schedule the periodic drain. Call once from the Tk main thread."""
+        self._widget_path = str(self.text_widget)
+        self.text_widget.tk.eval(self._APPEND_PROC_SRC)
+        for levelname, color in self.LEVEL_COLORS.items():
+            self.text_widget.tag_configure(levelname, foreground=color)
+        self.text_widget.bind("<Destroy>", self._on_destroy, add="+")
+        self.text_widget.after(self.DRAIN_INTERVAL_MS, self._drain)
+
+    def _on_destroy(self, event):
+        self._closed = True
+
+    def _drain(self):
+        # Stop for good once the widget is gone (window closed mid-operation)
+        if self._closed:
+            return
         try:
-            self.text_widget.configure(state="normal")
-            self.text_widget.insert(tk.END, msg + "\n")
-            self.text_widget.configure(state="disabled")
-            self.text_widget.see(tk.END)
-        except Exception:
-            pass
+            pending = self._queue
+            if pending:
+                popleft = pending.popleft
+                batch = [popleft() for _ in range(min(len(pending), self.MAX_BATCH))]
+                runs = []
+                for levelname, group in itertools.groupby(batch, key=itemgetter(0)):
+                    runs.append("".join(f"{line}\n" for _, line in group))
+                    runs.append(levelname)
+                self._append(runs)
+            self.text_widget.after(self.DRAIN_INTERVAL_MS, self._drain)
+        except tk.TclError:
+            self._closed = True
+
+    def _append(self, runs):
+        self.text_widget.tk.call(
+            self.APPEND_PROC, self._widget_path, self.max_lines, self.FOLLOW_THRESHOLD, *runs
+        )
+
+
+class GuiLogger:
+    """Logger-compatible front end that writes straight into a LogHandler.
+
+    The automation libraries only call debug/info/warning/error on the logger
+    they are given, so this skips LogRecord creation and handler dispatch for
+    them. Anything else falls through to the wrapped ``logging.Logger``.
+    """
+
+    def __init__(self, logger: logging.Logger, handler: LogHandler):
+        self._logger = logger
+        self._handler = handler
+        self._level = max(logger.getEffectiveLevel(), handler.level)
+
+    def __getattr__(self, name):
+        return getattr(self._logger, name)
+
+    def isEnabledFor(self, level: int) -> bool:
+        return level >= self._level
+
+    def log(self, level: int, msg, *args, exc_info=None, **kwargs):
+        if level < self._level:
+            return
+        if args:
+            # Same argument handling as LogRecord.getMessage: a single non-empty
+            # mapping supplies %(name)s fields
+            fmt_args = args[0] if len(args) == 1 and isinstance(args[0], Mapping) and args[0] else args
+            try:
+                msg = msg % fmt_args
+            except Exception:
+                # A bad format/argument pair is reported like any handler error
+                # instead of raising into the calling automation
+                self._handler.handleError(
+                    self._logger.makeRecord(self._logger.name, level, "(unknown file)", 0, msg, args, None))
+                return
+        if exc_info is True:
+            exc_info = sys.exc_info()
+        self._handler.post(level, str(msg), exc_info)
+
+    def debug(self, msg, *args, **kwargs):
+        self.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        self.log(logging.ERROR, msg, *args, **kwargs)
+
+    def exception(self, msg, *args, exc_info=True, **kwargs):
+        self.log(logging.ERROR, msg, *args, exc_info=exc_info, **kwargs)
+
+    def critical(self, msg, *args, **kwargs):
+        self.log(logging.CRITICAL, msg, *args, **kwargs)
 
 
 class E3AutomationGUI(ctk.CTk):
 
+    MAX_LINES = 2000        # lines kept in the on-screen log
+    HISTORY_LINES = 10000   # lines kept for "Save Log", even after trimming/clearing
+
     def __init__(self):
+        # CTk widgets read the colour theme when they are constructed, so it has
+        # to be in place before the window (and every widget) is created
+        apply_theme("red", "dark")
         super().__init__()
 
         self.title("E3 NA Standards Automation")
-        set_window_icon(self, "e3_na_standards")
         self.geometry("1200x640")
         self.minsize(1060, 520)
+        # The icon is cosmetic; load it once the window has been drawn
+        self.after_idle(set_window_icon, self, "e3_na_standards")
 
-        apply_theme("red", "dark")
+        # Set while an operation is queued/running; cleared on the UI thread when it ends
+        self._busy = threading.Event()
+        # Checked by Run All between steps
+        self._cancel_requested = threading.Event()
+        self._history = collections.deque(maxlen=self.HISTORY_LINES)
+        self._last_status = None
 
-        self.running_operation = False
+        # One long-lived worker runs operations serially; clicks only enqueue
+        self._job_queue = queue.Queue()
+        threading.Thread(target=self._worker_loop, daemon=True).start()
 
         self._build_ui()
         self._setup_logging()
@@ -123,9 +343,10 @@ class E3AutomationGUI(ctk.CTk):
         btn_frame.grid(row=1, column=0, padx=20, pady=10, sticky="ew")
         btn_frame.grid_columnconfigure((0, 1, 2, 3, 4, 5, 6), weight=1)
 
+        # One CTkFont shared by all six buttons instead of a font per widget
         red_btn = {
             "width": 190, "height": 60,
-            "font": ("Arial", 13, "bold"),
+            "font": ctk.CTkFont(family="Arial", size=13, weight="bold"),
             "fg_color": "#C53F3F", "hover_color": "#A02222",
         }
 
@@ -182,14 +403,26 @@ class E3AutomationGUI(ctk.CTk):
 
         ctk.CTkLabel(
             log_frame, text="Operation Log:", font=("Arial", 15, "bold"), anchor="w"
-        ).grid(row=0, column=0, padx=20, pady=(16, 8), sticky="ew")
+        ).grid(row=0, column=0, columnspan=2, padx=20, pady=(16, 8), sticky="ew")
 
-        self.log_text = scrolledtext.ScrolledText(
-            log_frame, wrap=tk.WORD, state="disabled",
+        # Plain tk.Text: no undo stack and no wrapping, so inserts stay cheap
+        self.log_text = tk.Text(
+            log_frame, wrap="none", state="disabled",
+            undo=False, autoseparators=False, maxundo=0,
             bg="#2b2b2b", fg="#ffffff",
             font=("Consolas", 10), insertbackground="#ffffff",
         )
-        self.log_text.grid(row=1, column=0, padx=20, pady=(0, 16), sticky="nsew")
+        self.log_text.grid(row=1, column=0, padx=(20, 0), pady=0, sticky="nsew")
+
+        log_yscroll = ctk.CTkScrollbar(log_frame, command=self.log_text.yview)
+        log_yscroll.grid(row=1, column=1, padx=(0, 20), sticky="ns")
+        log_xscroll = ctk.CTkScrollbar(
+            log_frame, orientation="horizontal", command=self.log_text.xview
+        )
+        log_xscroll.grid(row=2, column=0, padx=(20, 0), pady=(0, 16), sticky="ew")
+        self.log_text.configure(
+            yscrollcommand=log_yscroll.set, xscrollcommand=log_xscroll.set
+        )
 
         # Status bar
         status_bar = ctk.CTkFrame(self)
@@ -202,18 +435,33 @@ class E3AutomationGUI(ctk.CTk):
         )
         self.status_label.grid(row=0, column=0, padx=20, pady=10, sticky="ew")
 
+        self.cancel_btn = ctk.CTkButton(
+            status_bar, text="Cancel", command=self._cancel_run_all,
+            width=100, height=30, fg_color="#C53F3F", hover_color="#A02222",
+            state="disabled",
+        )
+        self.cancel_btn.grid(row=0, column=1, padx=(20, 0), pady=10)
+
+        ctk.CTkButton(
+            status_bar, text="Save Log", command=self._save_log,
+            width=100, height=30, fg_color="#666666", hover_color="#555555",
+        ).grid(row=0, column=2, padx=(20, 0), pady=10)
+
         ctk.CTkButton(
             status_bar, text="Clear Log", command=self._clear_log,
             width=100, height=30, fg_color="#666666", hover_color="#555555",
-        ).grid(row=0, column=1, padx=20, pady=10)
+        ).grid(row=0, column=3, padx=20, pady=10)
 
     def _setup_logging(self):
-        self.logger = logging.getLogger("E3AutomationGUI")
-        self.logger.setLevel(logging.INFO)
-        handler = LogHandler(self.log_text)
+        logger = logging.getLogger("E3AutomationGUI")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = LogHandler(self.log_text, max_lines=self.MAX_LINES, history=self._history)
         handler.setLevel(logging.INFO)
-        handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-        self.logger.addHandler(handler)
+        logger.addHandler(handler)
+        handler.start()
+        # GUI code and the operations it runs log through the direct-enqueue facade
+        self.logger = GuiLogger(logger, handler)
         self.logger.info("E3 NA Standards Automation started")
 
     # ------------------------------------------------------------------
@@ -221,11 +469,29 @@ class E3AutomationGUI(ctk.CTk):
     # ------------------------------------------------------------------
 
     def _clear_log(self):
+        # Only clears the view; the history is kept for "Save Log"
         self.log_text.configure(state="normal")
         self.log_text.delete(1.0, tk.END)
         self.log_text.configure(state="disabled")
         self.logger.info("Log cleared")
 
+    def _save_log(self):
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Save Log", defaultextension=".log",
+            initialfile="e3_na_standards.log",
+            filetypes=[("Log files", "*.log"), ("Text files", "*.txt"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(self._history))
+                f.write("\n")
+            self.logger.info(f"Log saved to {path}")
+        except OSError as exc:
+            self.logger.error(f"Failed to save log: {exc}")
+            messagebox.showerror("Error", f"Failed to save log:\n{exc}")
+
     def _set_buttons_enabled(self, enabled: bool):
         state = "normal" if enabled else "disabled"
         for btn in (
@@ -236,7 +502,19 @@ class E3AutomationGUI(ctk.CTk):
         ):
             btn.configure(state=state)
 
+    def _ui(self, callback, *args):
+        """Schedule callback(*args) on the Tk main thread.
+
+        Worker-side code must never touch widgets directly; every status,
+        button or dialog update goes through here.
+        """
+        self.after(0, callback, *args)
+
     def _set_status(self, message: str, color: str = "#FFFFFF"):
+        # Skip the CTk reconfigure/redraw when nothing changed
+        if (message, color) == self._last_status:
+            return
+        self._last_status = (message, color)
         self.status_label.configure(text=message, text_color=color)
 
     def _get_pid(self) -> int | None:
@@ -253,44 +531,59 @@ class E3AutomationGUI(ctk.CTk):
     def _wire_core_sync_operation(self, logger, pid: int) -> bool:
         """Adapter so WireCoreSynchronizer matches the (logger, pid) -> bool signature."""
         try:
-            return WireCoreSynchronizer(e3_pid=pid).run()
+            synchronizer_cls = _load_lib_attr("e3_wire_core_sync", "WireCoreSynchronizer")
+            return synchronizer_cls(e3_pid=pid).run()
         except Exception as exc:
             logger.error(f"Wire core synchronization failed: {exc}")
             return False
 
     # ------------------------------------------------------------------
-    # Generic thread runner
+    # Worker thread
     # ------------------------------------------------------------------
 
+    def _worker_loop(self):
+        """Run queued (target, args) jobs one at a time, forever."""
+        # Hold a COM apartment for the life of this thread, so each job's
+        # balanced CoInitialize/CoUninitialize pair never tears it down
+        try:
+            import pythoncom
+            pythoncom.CoInitialize()
+        except ImportError:
+            pass
+
+        while True:
+            target, args = self._job_queue.get()
+            try:
+                target(*args)
+            except Exception as exc:
+                self._ui(self._on_done, "Operation", False, str(exc))
+            finally:
+                self._job_queue.task_done()
+
     def _start_operation(self, operation_func, operation_name: str):
-        """Get PID on the main thread, then hand off to a daemon worker."""
-        if self.running_operation:
+        """Get PID on the main thread, then hand off to the worker."""
+        if self._busy.is_set():
             return
         pid = self._get_pid()
         if pid is None:
             return
 
-        self.running_operation = True
+        self._busy.set()
         self._set_buttons_enabled(False)
         self._set_status(f"Running {operation_name}...", "#FFA500")
         self.logger.info(f"Starting {operation_name}")
 
-        threading.Thread(
-            target=self._run_in_thread,
-            args=(operation_func, operation_name, pid),
-            daemon=True,
-        ).start()
+        self._job_queue.put((self._run_in_thread, (operation_func, operation_name, pid)))
 
     def _run_in_thread(self, operation_func, operation_name: str, pid: int):
         try:
             success = operation_func(self.logger, pid)
-            self.after(0, self._on_done, operation_name, success, None)
+            self._ui(self._on_done, operation_name, success, None)
         except Exception as exc:
-            self.after(0, self._on_done, operation_name, False, str(exc))
+            self._ui(self._on_done, operation_name, False, str(exc))
 
     def _on_done(self, operation_name: str, success: bool, error: str | None):
-        self.running_operation = False
-        self._set_buttons_enabled(True)
+        self._finish()
         if error:
             self.logger.error(f"Error during {operation_name}: {error}")
             self._set_status(f"Error during {operation_name}", "#FF0000")
@@ -303,6 +596,23 @@ class E3AutomationGUI(ctk.CTk):
             self._set_status(f"{operation_name} failed", "#FF0000")
             messagebox.showerror("Error", f"{operation_name} failed! Check the log for details.")
 
+    def _finish(self):
+        """Return the window to idle. UI thread only."""
+        self._busy.clear()
+        self._set_buttons_enabled(True)
+        self.cancel_btn.configure(state="disabled")
+
+    def _cancel_run_all(self):
+        self._cancel_requested.set()
+        self.cancel_btn.configure(state="disabled")
+        self._set_status("Cancelling after the current step...", "#FFA500")
+        self.logger.warning("Cancel requested; Run All will stop after the current step")
+
+    def _on_cancelled(self, next_name: str):
+        self._finish()
+        self.logger.warning(f"All Automation cancelled before {next_name}")
+        self._set_status("All Automation cancelled", "#FFA500")
+
     # ------------------------------------------------------------------
     # Individual operation buttons
     # ------------------------------------------------------------------
@@ -330,44 +640,60 @@ class E3AutomationGUI(ctk.CTk):
     # ------------------------------------------------------------------
 
     def run_all_automation(self):
-        if self.running_operation:
+        if self._busy.is_set():
             return
         pid = self._get_pid()
         if pid is None:
             return
 
-        self.running_operation = True
+        self._busy.set()
+        self._cancel_requested.clear()
         self._set_buttons_enabled(False)
+        self.cancel_btn.configure(state="normal")
         self._set_status("Running all automation scripts...", "#FFA500")
 
-        threading.Thread(
-            target=self._run_all_in_thread, args=(pid,), daemon=True
-        ).start()
+        self._job_queue.put((self._run_all_in_thread, (pid,)))
 
     def _run_all_in_thread(self, pid: int):
+        # The in-tree automations accept e3_objects and share one COM session;
+        # the others still open their own connection.
         operations = [
-            (run_wire_number_automation,        "Wire Number Automation"),
-            (self._wire_core_sync_operation,    "Wire Core Synchronization"),
-            (run_device_designation_automation, "Device Designation Automation"),
-            (run_terminal_pin_name_automation,  "Terminal Pin Name Automation"),
-            (run_field_connection_automation,   "Field Connection Tagging"),
-            (run_panel_path_level_automation,   "Panel Path Level Move"),
+            (run_wire_number_automation,        "Wire Number Automation",        True),
+            (self._wire_core_sync_operation,    "Wire Core Synchronization",     False),
+            (run_device_designation_automation, "Device Designation Automation", True),
+            (run_terminal_pin_name_automation,  "Terminal Pin Name Automation",  True),
+            (run_field_connection_automation,   "Field Connection Tagging",      False),
+            (run_panel_path_level_automation,   "Panel Path Level Move",         False),
         ]
 
-        total = len(operations)
-        for i, (func, name) in enumerate(operations, 1):
-            self.after(0, self._set_status, f"Running {name} ({i}/{total})...", "#FFA500")
-            self.logger.info(f"Starting {name} ({i}/{total})")
-            try:
-                success = func(self.logger, pid)
-            except Exception as exc:
-                self.after(0, self._on_done, f"All Automation — {name}", False, str(exc))
-                return
-            if not success:
-                self.after(0, self._on_done, f"All Automation — {name}", False, None)
-                return
+        connect_to_e3_with_pid = _load_lib_attr("e3_connection_manager", "connect_to_e3_with_pid")
+        release_e3_connection = _load_lib_attr("e3_connection_manager", "release_e3_connection")
+        connected, session = connect_to_e3_with_pid(pid, self.logger)
+        if not connected:
+            self._ui(self._on_done, "All Automation", False, None)
+            return
 
-        self.after(0, self._on_done, "All Automation", True, None)
+        try:
+            total = len(operations)
+            for i, (func, name, shares_session) in enumerate(operations, 1):
+                if self._cancel_requested.is_set():
+                    self._ui(self._on_cancelled, name)
+                    return
+                self._ui(self._set_status, f"Running {name} ({i}/{total})...", "#FFA500")
+                self.logger.info(f"Starting {name} ({i}/{total})")
+                kwargs = {"e3_objects": session} if shares_session else {}
+                try:
+                    success = func(self.logger, pid, **kwargs)
+                except Exception as exc:
+                    self._ui(self._on_done, f"All Automation — {name}", False, str(exc))
+                    return
+                if not success:
+                    self._ui(self._on_done, f"All Automation — {name}", False, None)
+                    return
+
+            self._ui(self._on_done, "All Automation", True, None)
+        finally:
+            release_e3_connection(session)
 
 
 # ---------------------------------------------------------------------------
@@ -20,12 +20,40 @@ Date: 2025-07-15
 """
 
 import psutil
-import tkinter as tk
-from tkinter import messagebox, ttk
 import logging
-from typing import List, Tuple, Optional
-import e3series
-import pythoncom
+import os
+import re
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Optional
+
+
+# Window-title lookups need pywin32; without it projects come from command lines only
+try:
+    import win32gui
+    import win32process
+    _HAS_WIN32 = True
+except ImportError:
+    _HAS_WIN32 = False
+
+# Matches E3.series process names (e3.series, e3series, e3.application, e3application)
+_E3_PROCESS_RE = re.compile(r'e3\.?(?:series|application)', re.IGNORECASE)
+
+# E3.series project file extensions
+_E3_EXTS = ('.e3p', '.e3', '.e3s')
+
+# Shortest window title that can carry a project name ("E3.series X")
+_MIN_TITLE_LEN = 11
+
+# Window title patterns used when extracting project names (compiled once)
+_E3_TITLE_RE = re.compile(r'e3\.(?:dtm|series)', re.IGNORECASE)
+_E3_SERIES_PREFIX_RE = re.compile(r'e3\.series', re.IGNORECASE)
+_TITLE_PART_BLACKLIST_RE = re.compile(r'e3\.series|e3\.dtm|zuken|professional', re.IGNORECASE)
+_SHEET_PREFIX_RE = re.compile(r'sheet', re.IGNORECASE)
+# A " - "-separated title part ending in a project file extension (not "[...]" sheet info)
+_PROJECT_FILE_RE = re.compile(r'(?:^| - )\s*((?:(?! - )[^\[])+?\.e3[ps]?)\s*(?= - |$)', re.IGNORECASE)
 
 
 class E3InstanceInfo:
@@ -35,19 +63,25 @@ class E3InstanceInfo:
         self.pid = pid
         self.name = name
         self.project_path = project_path
+        self._display_name = None
         
     def get_project_display_name(self) -> str:
         """Get a clean project name for display"""
+        if self._display_name is None:
+            self._display_name = self._compute_display_name()
+        return self._display_name
+
+    def _compute_display_name(self) -> str:
         if not self.project_path:
             return "No project detected"
             
         # Extract just the filename if it's a full path
         if '\\' in self.project_path or '/' in self.project_path:
-            import os
             project_name = os.path.basename(self.project_path)
             # Remove file extension for cleaner display
-            if project_name.endswith('.e3p') or project_name.endswith('.e3') or project_name.endswith('.e3s'):
-                project_name = os.path.splitext(project_name)[0]
+            head, dot, ext = project_name.rpartition('.')
+            if head and f".{ext}" in _E3_EXTS:
+                project_name = head
             return project_name
         
         # If it's already just a name, return as-is
@@ -67,10 +101,20 @@ class E3InstanceSelector:
         self.root = None
         self.connection_manager = connection_manager
         self.listbox = None
+        self.title_label = None
         
     def show_selection_dialog(self) -> Optional[E3InstanceInfo]:
         """Show the instance selection dialog and return the selected instance"""
-        self.root = tk.Tk()
+        import tkinter as tk
+
+        # When called from an app that already has a Tk root, open a Toplevel and
+        # wait on it inside that app's event loop instead of nesting a second one.
+        # Tk may only be driven from the thread that owns the root (the main
+        # thread), so other threads keep a private root and mainloop.
+        parent = None
+        if threading.current_thread() is threading.main_thread():
+            parent = getattr(tk, "_default_root", None)
+        self.root = tk.Toplevel(parent) if parent is not None else tk.Tk()
         self.root.title("Select E3.series Instance")
         self.root.geometry("800x500")
         self.root.resizable(True, True)
@@ -82,18 +126,27 @@ class E3InstanceSelector:
         self.root.geometry(f"800x500+{x}+{y}")
         
         # Make window modal
-        self.root.transient()
+        if parent is not None:
+            self.root.transient(parent)
+        else:
+            self.root.transient()
         self.root.grab_set()
         
         self._create_widgets()
         
-        # Start the GUI event loop
-        self.root.mainloop()
+        # Run until the dialog is closed
+        if parent is not None:
+            self.root.wait_window(self.root)
+        else:
+            self.root.mainloop()
         
         return self.selected_instance
         
     def _create_widgets(self):
         """Create the GUI widgets"""
+        import tkinter as tk
+        from tkinter import ttk
+
         # Main frame
         main_frame = ttk.Frame(self.root, padding="10")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -105,12 +158,12 @@ class E3InstanceSelector:
         main_frame.rowconfigure(3, weight=1)  # Listbox frame row
         
         # Title label
-        title_label = ttk.Label(
+        self.title_label = ttk.Label(
             main_frame,
             text=f"Multiple E3.series instances detected ({len(self.instances)} found)",
             font=("Arial", 14, "bold")
         )
-        title_label.grid(row=0, column=0, pady=(0, 10), sticky=tk.W)
+        self.title_label.grid(row=0, column=0, pady=(0, 10), sticky=tk.W)
         
         # Instructions label
         instructions_label = ttk.Label(
@@ -143,12 +196,8 @@ class E3InstanceSelector:
         self.listbox.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
-        # Populate listbox
+        # Populate listbox (selects the first item)
         self._populate_listbox()
-            
-        # Select first item by default
-        if self.instances:
-            self.listbox.selection_set(0)
         
         # Button frame
         button_frame = ttk.Frame(main_frame)
@@ -193,37 +242,35 @@ class E3InstanceSelector:
         self.listbox.focus_set()
     
     def _populate_listbox(self):
-        """Populate the listbox with current instances"""
+        """Populate the listbox with current instances and select the first one"""
+        import tkinter as tk
+
+        # Rebuild in one go: clear, insert everything, then select once, with no
+        # idle processing in between, so Tk redraws the list a single time
         self.listbox.delete(0, tk.END)
-        for instance in self.instances:
-            display_text = f"PID {instance.pid:>6} │ {instance.get_project_display_name()}"
-            self.listbox.insert(tk.END, display_text)
+        rows = [f"PID {instance.pid:>6} │ {instance.get_project_display_name()}" for instance in self.instances]
+        if rows:
+            # One variadic insert instead of one Tcl call per row
+            self.listbox.insert(tk.END, *rows)
+            self.listbox.selection_set(0)
     
     def _on_refresh(self):
         """Refresh the list of E3.series instances"""
         if self.connection_manager:
             # Get updated list of instances
-            self.instances = self.connection_manager.get_running_e3_instances()
+            self.instances = self.connection_manager.get_running_e3_instances(use_cache=False)
             
-            # Update the listbox
+            # Update the listbox (selects the first item)
             self._populate_listbox()
             
-            # Select first item if available
-            if self.instances:
-                self.listbox.selection_set(0)
-            
             # Update the title to show new count
             title_text = f"Multiple E3.series instances detected ({len(self.instances)} found)"
-            # Find and update the title label (this is a bit hacky but works)
-            for child in self.root.winfo_children():
-                if isinstance(child, ttk.Frame):
-                    for grandchild in child.winfo_children():
-                        if isinstance(grandchild, ttk.Label) and "instances detected" in grandchild.cget("text"):
-                            grandchild.configure(text=title_text)
-                            break
+            self.title_label.configure(text=title_text)
         
     def _on_select(self):
         """Handle selection"""
+        from tkinter import messagebox
+
         selection = self.listbox.curselection()
         if selection:
             index = selection[0]
@@ -240,166 +287,250 @@ class E3InstanceSelector:
 
 class E3ConnectionManager:
     """Manages E3.series instance detection and connection"""
-    
+
+    # Detected instances are reused for this many seconds (shared by all managers)
+    INSTANCE_CACHE_TTL = 2.0
+    _instance_cache = None  # (time.monotonic() timestamp, instances)
+    # Visible top-level window handles last seen per PID, so later lookups can
+    # re-read their titles directly instead of enumerating every window
+    _hwnds_by_pid: Dict[int, List[int]] = {}
+    # Project path found on each process's command line, keyed by PID and
+    # validated by create_time so a reused PID is never served a stale entry
+    _cmdline_project_cache: Dict[int, Tuple[float, str]] = {}
+    # Instances from the last resolved scan, keyed by (pid, create_time)
+    _known_instances: Dict[Tuple[int, float], E3InstanceInfo] = {}
+
     def __init__(self, logger=None):
         self.logger = logger or logging.getLogger(__name__)
         
-    def get_running_e3_instances(self) -> List[E3InstanceInfo]:
-        """Get list of running E3.series instances"""
+    def get_running_e3_instances(self, use_cache: bool = True) -> List[E3InstanceInfo]:
+        """
+        Get list of running E3.series instances
+
+        Args:
+            use_cache: Reuse a scan made within the last INSTANCE_CACHE_TTL seconds
+
+        Returns:
+            List of detected E3.series instances
+        """
+        cache = E3ConnectionManager._instance_cache
+        if use_cache and cache and time.monotonic() - cache[0] < self.INSTANCE_CACHE_TTL:
+            return list(cache[1])
+
+        try:
+            return self._resolve_instances(self._find_e3_processes())
+        except Exception as e:
+            self.logger.error(f"Error detecting E3.series instances: {e}")
+            return []
+
+    def _find_e3_processes(self) -> List[tuple]:
+        """Return (proc, pid, name) for every running E3.series process"""
+        # process_iter fills proc.info up front (None for fields it can't read),
+        # so the filter itself can't raise for processes that exit or deny access
+        return [
+            (proc, proc.info['pid'], proc.info['name'])
+            for proc in psutil.process_iter(['pid', 'name'])
+            if proc.info['name'] and _E3_PROCESS_RE.search(proc.info['name'])
+        ]
+
+    def _resolve_instances(self, e3_processes: List[tuple]) -> List[E3InstanceInfo]:
+        """
+        Look up the project of each process from _find_e3_processes.
+
+        The result is stored as the cached scan (see get_running_e3_instances).
+
+        Args:
+            e3_processes: (proc, pid, name) tuples from _find_e3_processes
+
+        Returns:
+            List of E3InstanceInfo, in the same order
+        """
         instances = []
-        
+
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'exe']):
+            # Read project paths from command lines; these are blocking OS calls,
+            # so with several instances run them concurrently
+            procs = [proc for proc, _, _ in e3_processes]
+            if len(procs) > 1:
+                with ThreadPoolExecutor(max_workers=min(8, len(procs))) as executor:
+                    project_paths = list(executor.map(self._get_project_path_from_cmdline, procs))
+            else:
+                project_paths = [self._get_project_path_from_cmdline(proc) for proc in procs]
+
+            # Fall back to window titles, with one EnumWindows pass for all remaining instances
+            missing = {pid for (_, pid, _), path in zip(e3_processes, project_paths) if not path}
+            if missing:
+                titles_by_pid = self._enumerate_windows_by_pid(missing)
+                project_paths = [
+                    path or self._extract_project_from_titles(titles_by_pid.get(pid, []))
+                    for (_, pid, _), path in zip(e3_processes, project_paths)
+                ]
+
+            # Reuse the E3InstanceInfo (and its memoized display name) of an instance
+            # seen before with the same project; keyed by (pid, create_time) so a
+            # reused PID is a new instance. Unseen instances are dropped.
+            known = E3ConnectionManager._known_instances
+            seen = {}
+            for (proc, pid, proc_name), project_path in zip(e3_processes, project_paths):
                 try:
-                    proc_info = proc.info
-                    proc_name = proc_info['name'] or ""
-                    
-                    # Check for various E3.series process names
-                    e3_patterns = [
-                        'e3.series',
-                        'e3series',
-                        'e3.application',
-                        'e3application'
-                    ]
-                    
-                    is_e3_process = any(pattern in proc_name.lower() for pattern in e3_patterns)
-                    
-                    if is_e3_process:
-                        # Try to get more detailed information
-                        project_path = self._get_project_path_from_process(proc)
-                        instance = E3InstanceInfo(
-                            pid=proc_info['pid'],
-                            name=proc_name,
-                            project_path=project_path
-                        )
-                        instances.append(instance)
-                        
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    # Process might have terminated or we don't have access
-                    continue
-                    
+                    key = (pid, proc.create_time())
+                except psutil.Error:
+                    key = None
+                instance = known.get(key)
+                if instance is None or instance.project_path != project_path:
+                    instance = E3InstanceInfo(pid=pid, name=proc_name, project_path=project_path)
+                if key is not None:
+                    seen[key] = instance
+                instances.append(instance)
+            E3ConnectionManager._known_instances = seen
+
         except Exception as e:
             self.logger.error(f"Error detecting E3.series instances: {e}")
-            
-        return instances
 
-    def _get_project_path_from_process(self, proc) -> str:
-        """Try to get the project path from process command line, window title, or E3 API"""
-        project_path = ""
-        pid = proc.pid
+        E3ConnectionManager._instance_cache = (time.monotonic(), instances)
+        return list(instances)
 
+    def _get_project_path_from_process(self, proc, window_titles: Optional[List[str]] = None) -> str:
+        """Try to get the project path from process command line or window title"""
         # Method 1: Check command line arguments for project files
+        project_path = self._get_project_path_from_cmdline(proc)
+        if project_path:
+            return project_path
+
+        # Method 2: Window titles (Windows-specific)
+        # (An E3 API lookup is not used: it connects to the active instance, not a
+        # specific PID, so it returns the wrong project for non-active instances)
+        if window_titles is None:
+            window_titles = self._enumerate_windows_by_pid({proc.pid}).get(proc.pid, [])
+        return self._extract_project_from_titles(window_titles)
+
+    def _get_project_path_from_cmdline(self, proc) -> str:
+        """Return the first project file argument on the process command line, or an empty string"""
         try:
-            cmdline = proc.cmdline()
-            for arg in cmdline:
-                if arg.endswith('.e3p') or arg.endswith('.e3') or arg.endswith('.e3s'):
+            create_time = proc.create_time()
+            cached = E3ConnectionManager._cmdline_project_cache.get(proc.pid)
+            if cached and cached[0] == create_time:
+                return cached[1]
+
+            project_path = ""
+            for arg in proc.cmdline():
+                if arg.endswith(_E3_EXTS):
                     project_path = arg
                     break
-        except Exception as e:
-            pass
-
-        # If we found a project in command line, return it immediately
-        if project_path:
+            E3ConnectionManager._cmdline_project_cache[proc.pid] = (create_time, project_path)
             return project_path
+        except Exception:
+            return ""
 
-        # Method 2: Try to get window title (Windows-specific) - moved before API method
-        if not project_path:
-            try:
-                import win32gui
-                import win32process
-
-                def enum_windows_callback(hwnd, pid_data):
-                    try:
-                        _, found_pid = win32process.GetWindowThreadProcessId(hwnd)
-                        if found_pid == pid_data['target_pid']:
-                            window_title = win32gui.GetWindowText(hwnd)
-                            if window_title and win32gui.IsWindowVisible(hwnd):
-                                pid_data['titles'].append(window_title)
-                    except:
-                        pass
-                    return True
-
-                pid_data = {'target_pid': pid, 'titles': []}
-                win32gui.EnumWindows(enum_windows_callback, pid_data)
-
-                # Look for E3.series windows and extract project names
-                for title in pid_data['titles']:
-                    if 'e3.dtm' in title.lower() or 'e3.series' in title.lower():
-                        # Try different patterns for project extraction
-                        if ' - ' in title:
-                            parts = title.split(' - ')
-                            # Look for the first part that looks like a project file
-                            for part in parts:
-                                part = part.strip()
-                                if (part and
-                                    'e3.series' not in part.lower() and
-                                    'e3.dtm' not in part.lower() and
-                                    'zuken' not in part.lower() and
-                                    'professional' not in part.lower() and
-                                    not part.startswith('[') and  # Skip sheet info like [Sheet 1]
-                                    (part.endswith('.e3s') or part.endswith('.e3p') or part.endswith('.e3') or
-                                     (len(part) > 3 and not part.lower().startswith('sheet')))):
-                                    project_path = part
-                                    break
-                        elif title.lower().startswith('e3.series'):
-                            # Format like "E3.series ProjectName"
-                            remaining = title[9:].strip()  # Remove "E3.series"
-                            if remaining and not remaining.lower().startswith('v'):  # Skip version info
-                                project_path = remaining
-
-                        if project_path:
-                            break
-
-            except ImportError:
-                pass
-            except Exception as e:
-                pass
-
-        # Method 3: E3 API method disabled - it connects to active instance, not specific PID
-        # This causes incorrect project names to be returned for non-active instances
+    def _enumerate_windows_by_pid(self, pids) -> Dict[int, List[str]]:
+        """
+        Collect visible top-level window titles for the given PIDs in one EnumWindows pass.
 
-        return project_path
+        Args:
+            pids: Set of process IDs to collect titles for
+
+        Returns:
+            Dict mapping PID to its window titles (PIDs without windows are omitted)
+        """
+        titles_by_pid = {}
+        if not _HAS_WIN32:
+            return titles_by_pid
 
-    def _get_project_from_e3_api(self, pid: int) -> str:
-        """Try to get project information directly from E3 API"""
-        # Note: The E3 API doesn't support connecting to specific PIDs directly
-        # This method connects to the "active" E3 instance, which may not be
-        # the one we want. It's kept as a fallback but may return incorrect data.
         try:
-            # Initialize COM for this thread
-            pythoncom.CoInitialize()
-
-            # Try to connect to E3 and get project information
-            # WARNING: This connects to the active instance, not necessarily the one with the given PID
-            app = e3series.Application()
-            job = app.CreateJobObject()
-
-            # Try to get project name/path
-            try:
-                project_name = job.GetName()
-                if project_name:
-                    return project_name
-            except:
-                pass
-
-            # Try alternative methods to get project info
-            try:
-                project_path = job.GetProjectPath()
-                if project_path:
-                    return project_path
-            except:
-                pass
+            # Fast path: re-read titles of windows found by an earlier enumeration.
+            # Only trusted if they still name a project; otherwise enumerate again
+            # in case the instance has opened new windows since.
+            pids = set(pids)
+            for pid in list(pids):
+                titles = self._read_cached_window_titles(pid)
+                if titles and self._extract_project_from_titles(titles):
+                    titles_by_pid[pid] = titles
+                    pids.discard(pid)
+            if not pids:
+                return titles_by_pid
+
+            hwnds_by_pid = {}
+
+            def enum_windows_callback(hwnd, _):
+                try:
+                    _, found_pid = win32process.GetWindowThreadProcessId(hwnd)
+                    if found_pid in pids and win32gui.IsWindowVisible(hwnd):
+                        hwnds_by_pid.setdefault(found_pid, []).append(hwnd)
+                        window_title = win32gui.GetWindowText(hwnd)
+                        if len(window_title) >= _MIN_TITLE_LEN:
+                            titles_by_pid.setdefault(found_pid, []).append(window_title)
+                except:
+                    pass
+                return True
+
+            win32gui.EnumWindows(enum_windows_callback, None)
+            E3ConnectionManager._hwnds_by_pid.update(hwnds_by_pid)
 
         except Exception as e:
-            # Connection failed or API not available
             pass
-        finally:
-            try:
-                pythoncom.CoUninitialize()
-            except:
-                pass
 
-        return ""
+        return titles_by_pid
+
+    def _read_cached_window_titles(self, pid: int) -> Optional[List[str]]:
+        """
+        Re-read the titles of the windows cached for a PID.
+
+        Returns:
+            The titles, or None if there is no cache entry or any cached window
+            is gone, hidden or now belongs to another process (the entry is dropped)
+        """
+        hwnds = E3ConnectionManager._hwnds_by_pid.get(pid)
+        if not hwnds:
+            return None
+        titles = []
+        try:
+            for hwnd in hwnds:
+                if (not win32gui.IsWindow(hwnd) or not win32gui.IsWindowVisible(hwnd) or
+                        win32process.GetWindowThreadProcessId(hwnd)[1] != pid):
+                    raise LookupError(hwnd)
+                window_title = win32gui.GetWindowText(hwnd)
+                if len(window_title) >= _MIN_TITLE_LEN:
+                    titles.append(window_title)
+        except Exception:
+            E3ConnectionManager._hwnds_by_pid.pop(pid, None)
+            return None
+        return titles
+
+    def _extract_project_from_titles(self, titles: List[str]) -> str:
+        """Extract a project name from E3.series window titles"""
+        project_path = ""
+
+        # Look for E3.series windows and extract project names
+        for title in titles:
+            if len(title) >= _MIN_TITLE_LEN and _E3_TITLE_RE.search(title):
+                # Try different patterns for project extraction
+                if ' - ' in title:
+                    # Fast path: a " - "-separated part that is a project file name
+                    match = _PROJECT_FILE_RE.search(title)
+                    if match and not _TITLE_PART_BLACKLIST_RE.search(match.group(1)):
+                        project_path = match.group(1)
+                    else:
+                        parts = title.split(' - ')
+                        # Look for the first part that looks like a project name
+                        for part in parts:
+                            part = part.strip()
+                            if (part and
+                                not _TITLE_PART_BLACKLIST_RE.search(part) and
+                                not part.startswith('[') and  # Skip sheet info like [Sheet 1]
+                                (part.endswith(_E3_EXTS) or
+                                 (len(part) > 3 and not _SHEET_PREFIX_RE.match(part)))):
+                                project_path = part
+                                break
+                elif _E3_SERIES_PREFIX_RE.match(title):
+                    # Format like "E3.series ProjectName"
+                    remaining = title[9:].strip()  # Remove "E3.series"
+                    if remaining and not remaining.lower().startswith('v'):  # Skip version info
+                        project_path = remaining
+
+                if project_path:
+                    break
+
+        return project_path
 
     def select_e3_instance(self) -> Optional[int]:
         """
@@ -408,9 +539,17 @@ class E3ConnectionManager:
         Returns:
             PID of selected E3.series instance, or None if cancelled/no instances
         """
-        instances = self.get_running_e3_instances()
+        # One scan decides between connecting directly and the selection dialog;
+        # every instance's project is only looked up when the dialog is needed
+        try:
+            e3_processes = self._find_e3_processes()
+        except Exception as e:
+            self.logger.error(f"Error detecting E3.series instances: {e}")
+            e3_processes = []
+
+        if not e3_processes:
+            from tkinter import messagebox
 
-        if not instances:
             self.logger.error("No running E3.series instances found")
             messagebox.showerror(
                 "No E3.series Instances",
@@ -419,14 +558,21 @@ class E3ConnectionManager:
             )
             return None
 
-        elif len(instances) == 1:
-            # Only one instance, use it automatically
-            instance = instances[0]
-            self.logger.info(f"Found single E3.series instance: {instance}")
-            return instance.pid
+        elif len(e3_processes) == 1:
+            # Only one instance, use it automatically; its command line usually
+            # names the project (no window title search for a log line)
+            proc, pid, proc_name = e3_processes[0]
+            instance = E3InstanceInfo(pid=pid, name=proc_name,
+                                      project_path=self._get_project_path_from_cmdline(proc))
+            if instance.project_path:
+                self.logger.info(f"Found single E3.series instance: {instance}")
+            else:
+                self.logger.info(f"Found single E3.series instance (PID {pid})")
+            return pid
 
         else:
-            # Multiple instances, show selection dialog
+            # Multiple instances, show selection dialog for exactly these instances
+            instances = self._resolve_instances(e3_processes)
             self.logger.info(f"Found {len(instances)} E3.series instances")
             selector = E3InstanceSelector(instances, self)
             selected_instance = selector.show_selection_dialog()
@@ -439,6 +585,54 @@ class E3ConnectionManager:
                 return None
 
 
+class _LazyE3Objects(Mapping):
+    """
+    E3 API objects for one connection, created on first access.
+
+    'app' and 'job' exist up front; the other objects are only created
+    (one job.Create*Object() COM call each) when a caller first asks for
+    them, and are then reused for the life of the connection. After clear()
+    the mapping is empty.
+    """
+
+    _FACTORIES = {
+        'connection': 'CreateConnectionObject',
+        'pin': 'CreatePinObject',
+        'sheet': 'CreateSheetObject',
+        'signal': 'CreateSignalObject',
+        'net': 'CreateNetObject',
+        'net_segment': 'CreateNetSegmentObject',
+        'device': 'CreateDeviceObject',
+        'symbol': 'CreateSymbolObject',
+    }
+
+    def __init__(self, app, job):
+        self._objects = {'app': app, 'job': job}
+
+    def __getitem__(self, key):
+        try:
+            return self._objects[key]
+        except KeyError:
+            # Nothing can be created once the connection is released
+            if 'job' not in self._objects:
+                raise
+            factory = self._FACTORIES[key]
+            obj = self._objects[key] = getattr(self._objects['job'], factory)()
+            return obj
+
+    def __iter__(self):
+        if 'job' not in self._objects:
+            return iter(())
+        return iter(('app', 'job', *self._FACTORIES))
+
+    def __len__(self):
+        return 2 + len(self._FACTORIES) if 'job' in self._objects else 0
+
+    def clear(self):
+        """Drop every object created so far (see release_e3_connection)"""
+        self._objects.clear()
+
+
 def get_e3_connection_pid(logger=None) -> Optional[int]:
     """
     Convenience function to get E3.series connection PID.
@@ -456,7 +650,7 @@ def get_e3_connection_pid(logger=None) -> Optional[int]:
     return manager.select_e3_instance()
 
 
-def connect_to_e3_with_pid(pid: int, logger=None) -> Tuple[bool, dict]:
+def connect_to_e3_with_pid(pid: int, logger=None) -> Tuple[bool, Mapping]:
     """
     Connect to E3.series using a specific PID.
 
@@ -465,35 +659,52 @@ def connect_to_e3_with_pid(pid: int, logger=None) -> Tuple[bool, dict]:
         logger: Optional logger instance
 
     Returns:
-        Tuple of (success: bool, objects: dict) where objects contains
-        the E3 API objects (app, job, etc.)
+        Tuple of (success: bool, objects: Mapping) where objects maps
+        'app', 'job', 'pin', etc. to the E3 API objects
     """
     if logger is None:
         logger = logging.getLogger(__name__)
 
+    com_initialized = False
     try:
-        # Initialize COM
+        # COM libraries are imported on first connect; detection/selection doesn't need them
+        import e3series
+        import pythoncom
+
+        # Initialize COM; balanced by release_e3_connection
         pythoncom.CoInitialize()
+        com_initialized = True
 
         app = e3series.Application(pid)
         job = app.CreateJobObject()
 
-        objects = {
-            'app': app,
-            'job': job,
-            'connection': job.CreateConnectionObject(),
-            'pin': job.CreatePinObject(),
-            'sheet': job.CreateSheetObject(),
-            'signal': job.CreateSignalObject(),
-            'net': job.CreateNetObject(),
-            'net_segment': job.CreateNetSegmentObject(),
-            'device': job.CreateDeviceObject(),
-            'symbol': job.CreateSymbolObject()
-        }
+        # The remaining objects (pin, sheet, ...) are created on first access
+        objects = _LazyE3Objects(app, job)
 
         logger.info(f"Successfully connected to E3.series instance (PID: {pid})")
         return True, objects
 
     except Exception as e:
         logger.error(f"Failed to connect to E3.series instance (PID: {pid}): {e}")
+        if com_initialized:
+            pythoncom.CoUninitialize()
         return False, {}
+
+
+def release_e3_connection(objects: Mapping):
+    """
+    Release a session opened with connect_to_e3_with_pid.
+
+    Drops the COM proxies so E3.series can free them, then balances the
+    CoInitialize made by connect_to_e3_with_pid. Every successful connection
+    must be released exactly once, on the thread that opened it.
+
+    Args:
+        objects: The objects mapping returned by connect_to_e3_with_pid
+    """
+    objects.clear()
+    try:
+        import pythoncom
+        pythoncom.CoUninitialize()
+    except Exception:
+        pass
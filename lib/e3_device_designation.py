@@ -28,17 +28,22 @@ Updated: 2025-07-11 - Added cable support using e3Job.GetCableIds() and e3Device
 Updated: 2025-07-11 - Converted to library module for GUI integration
 """
 
+import gc
 import logging
+import string
 import sys
-from typing import Dict, List, Tuple, Optional
+from collections import defaultdict
+from typing import Dict, List, Literal, Tuple, Optional
 import e3series
-import pythoncom
 
 
 class DeviceDesignationManager:
     """Manages device and cable designation automation for E3.series projects"""
-    
-    def __init__(self, logger=None, e3_pid=None):
+
+    # Conflict suffixes by position: none for the first device, then A..Z, AA..ZZ
+    _SUFFIXES = [''] + list(string.ascii_uppercase) + [a + b for a in string.ascii_uppercase for b in string.ascii_uppercase]
+
+    def __init__(self, logger=None, e3_pid=None, e3_objects=None):
         self.app = None
         self.job = None
         self.device = None
@@ -46,21 +51,32 @@ class DeviceDesignationManager:
         self.sheet = None
         self.logger = logger or logging.getLogger(__name__)
         self.e3_pid = e3_pid
+        self.e3_objects = e3_objects
+        self._session = None  # connection opened by this instance (released in run)
+
+        # Per-run caches of device properties (each lookup is a COM round-trip)
+        self._device_kinds: Dict[int, str] = {}
+        self._sheet_name_cache: Dict[int, str] = {}
 
-        
     def connect_to_e3(self):
         """Connect to E3 application using connection manager"""
         try:
-            # Get E3 PID if not already provided
-            if self.e3_pid is None:
-                from .e3_connection_manager import get_e3_connection_pid
-                self.e3_pid = get_e3_connection_pid(self.logger)
+            # Reuse a session opened by the caller (e.g. the GUI's "Run All")
+            if self.e3_objects is not None:
+                success, objects = True, self.e3_objects
+            else:
+                # Get E3 PID if not already provided
                 if self.e3_pid is None:
-                    return False
-
-            # Connect using the PID
-            from .e3_connection_manager import connect_to_e3_with_pid
-            success, objects = connect_to_e3_with_pid(self.e3_pid, self.logger)
+                    from .e3_connection_manager import get_e3_connection_pid
+                    self.e3_pid = get_e3_connection_pid(self.logger)
+                    if self.e3_pid is None:
+                        return False
+
+                # Connect using the PID
+                from .e3_connection_manager import connect_to_e3_with_pid
+                success, objects = connect_to_e3_with_pid(self.e3_pid, self.logger)
+                if success:
+                    self._session = objects
             if success:
                 self.app = objects['app']
                 self.job = objects['job']
@@ -88,11 +104,8 @@ class DeviceDesignationManager:
             return ""
             
         # Extract grid part after the last dot
-        parts = grid_desc.split('.')
-        if len(parts) >= 2:
-            return parts[-1]
-        
-        return grid_desc
+        _, sep, grid = grid_desc.rpartition('.')
+        return grid if sep else grid_desc
     
     def get_device_letter_code(self, device_id: int) -> str:
         """
@@ -146,9 +159,6 @@ class DeviceDesignationManager:
             # Get all symbols for this device
             symbol_ids_result = self.device.GetSymbolIds()
 
-            if not symbol_ids_result or symbol_ids_result == 0:
-                symbol_ids_result = self.device.GetSymbolIds(1)  # 1 = placed symbols only
-
             if not symbol_ids_result or symbol_ids_result == 0:
                 return None, None, None
 
@@ -166,7 +176,7 @@ class DeviceDesignationManager:
             if not symbol_ids:
                 return None, None, None
 
-            self.logger.debug(f"Device {device_id}: Found {len(symbol_ids)} symbols: {symbol_ids}")
+            self.logger.debug("Device %s: Found %s symbols: %s", device_id, len(symbol_ids), symbol_ids)
 
             # Use the FIRST symbol returned by E3 (this is the "first symbol" according to E3's internal order)
             first_symbol_id = symbol_ids[0]
@@ -184,17 +194,20 @@ class DeviceDesignationManager:
                     if not isinstance(sheet_id, int) or sheet_id <= 0:
                         return None, None, None
 
-                    # Get sheet assignment
-                    self.sheet.SetId(sheet_id)
-                    sheet_assignment = self.sheet.GetName()
+                    # Get sheet assignment (many devices share a sheet)
+                    sheet_assignment = self._sheet_name_cache.get(sheet_id)
+                    if sheet_assignment is None:
+                        self.sheet.SetId(sheet_id)
+                        sheet_assignment = self.sheet.GetName()
+                        self._sheet_name_cache[sheet_id] = sheet_assignment
 
                     grid_position = self.extract_grid_position(grid_desc)
 
-                    self.logger.debug(f"Device {device_id}: Using first symbol {first_symbol_id} at sheet {sheet_assignment}, grid {grid_position}, pos ({x_pos}, {y_pos})")
+                    self.logger.debug("Device %s: Using first symbol %s at sheet %s, grid %s, pos (%s, %s)", device_id, first_symbol_id, sheet_assignment, grid_position, x_pos, y_pos)
                     return sheet_assignment, grid_position, first_symbol_id
 
             except Exception as e:
-                self.logger.debug(f"Error processing first symbol {first_symbol_id} for device {device_id}: {e}")
+                self.logger.debug("Error processing first symbol %s for device %s: %s", first_symbol_id, device_id, e)
                 return None, None, None
 
             return None, None, None
@@ -219,15 +232,12 @@ class DeviceDesignationManager:
         try:
             self.device.SetId(device_id)
 
-            # Use official E3 API methods to check if device is a terminal
-            is_terminal = self.device.IsTerminal()
-            is_terminal_block = self.device.IsTerminalBlock()
-
-            # Return True if either method indicates this is a terminal device
-            result = (is_terminal == 1) or (is_terminal_block == 1)
+            # Use official E3 API methods to check if device is a terminal;
+            # IsTerminalBlock() is only asked when IsTerminal() says no
+            result = self._check_terminal()
 
             if result:
-                self.logger.debug(f"Device {device_id} identified as terminal device (IsTerminal={is_terminal}, IsTerminalBlock={is_terminal_block})")
+                self.logger.debug("Device %s identified as terminal device", device_id)
 
             return result
 
@@ -246,13 +256,18 @@ class DeviceDesignationManager:
                 self.logger.error(f"Error in fallback terminal detection for device {device_id}: {e2}")
                 return False
 
-    def assign_suffix_for_conflicts(self, designations: Dict[str, List[int]], device_data: Dict) -> Dict[int, str]:
+    def _check_terminal(self) -> bool:
+        """Terminal check for the currently selected device, asking IsTerminalBlock() only if needed"""
+        if self.device.IsTerminal() == 1:
+            return True
+        return self.device.IsTerminalBlock() == 1
+
+    def assign_suffix_for_conflicts(self, designations: Dict[str, List[int]]) -> Dict[int, str]:
         """
         Assign letter suffixes for conflicting device designations.
 
         Args:
             designations: Dictionary mapping base designation to list of device IDs
-            device_data: Dictionary mapping device ID to device information including first_symbol_id
 
         Returns:
             Dictionary mapping device ID to final designation with suffix
@@ -264,83 +279,24 @@ class DeviceDesignationManager:
                 # No conflict, use base designation
                 final_designations[device_ids[0]] = base_designation
             else:
-                # Multiple devices with same base designation, sort by first symbol order and add suffixes
+                # Multiple devices with same base designation, sort by device ID and add suffixes
                 self.logger.info(f"Found {len(device_ids)} devices with designation '{base_designation}', adding suffixes")
 
-                # Sort devices by their device ID for consistent ordering
-                device_orders = []
-                for device_id in device_ids:
-                    try:
-                        # Use the first symbol ID that was already identified for this device
-                        if device_id in device_data and 'first_symbol_id' in device_data[device_id]:
-                            first_symbol_id = device_data[device_id]['first_symbol_id']
-
-                            try:
-                                self.symbol.SetId(first_symbol_id)
-                                location = self.symbol.GetSchemaLocation()
-                                if len(location) >= 3:
-                                    x_pos = location[1]
-                                    self.logger.debug(f"Device {device_id} first symbol {first_symbol_id}: x_pos={x_pos}")
-                                    device_orders.append((device_id, x_pos, device_id))
-                                else:
-                                    self.logger.debug(f"Could not get location for first symbol {first_symbol_id} of device {device_id}")
-                                    device_orders.append((device_id, 0.0, device_id))
-                            except Exception as e:
-                                self.logger.debug(f"Could not get position for first symbol {first_symbol_id} of device {device_id}: {e}")
-                                device_orders.append((device_id, 0.0, device_id))
-                        else:
-                            self.logger.debug(f"No first symbol ID found for device {device_id}")
-                            device_orders.append((device_id, 0.0, device_id))
-                    except Exception as e:
-                        self.logger.debug(f"Could not get position for device {device_id}: {e}")
-                        # If we can't get position, add with default values
-                        device_orders.append((device_id, 0.0, device_id))
-
-                # Sort by device ID for consistent ordering
-                device_orders.sort(key=lambda x: x[0])
-
-                # Assign suffixes - first device keeps original designation, others get suffixes
-                for i, (_, _, device_id) in enumerate(device_orders):
-                    if i == 0:
+                # Assign suffixes in device ID order - first device keeps original designation, others get suffixes
+                for i, device_id in enumerate(sorted(device_ids)):
+                    suffix = self._SUFFIXES[i]
+                    if not suffix:
                         # First device keeps the original designation (no suffix)
                         final_designations[device_id] = base_designation
                         self.logger.info(f"Device {device_id} assigned designation: {base_designation} (first device, no suffix)")
                     else:
-                        # Subsequent devices get suffixes starting with A
-                        suffix = chr(ord('A') + i - 1)  # i-1 so second device gets 'A', third gets 'B', etc.
+                        # Subsequent devices get suffixes A..Z, then AA, AB, ...
                         final_designation = f"{base_designation}.{suffix}"
                         final_designations[device_id] = final_designation
                         self.logger.info(f"Device {device_id} assigned designation: {final_designation}")
 
         return final_designations
 
-    def update_device_designation(self, device_id: int, designation: str) -> bool:
-        """
-        Update the device designation attribute.
-
-        Args:
-            device_id: Device ID
-            designation: New designation
-
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            self.device.SetId(device_id)
-
-            # Use SetName() to set the device designation
-            result = self.device.SetName(designation)
-            if result > 0:  # Success
-                self.logger.info(f"Updated device {device_id} designation to '{designation}' using SetName()")
-                return True
-            else:
-                self.logger.warning(f"SetName() failed for device {device_id}, result: {result}")
-                return False
-
-        except Exception as e:
-            self.logger.error(f"Error updating designation for device {device_id}: {e}")
-            return False
-
     def get_all_device_and_cable_ids(self):
         """
         Get all device IDs and cable IDs from the project.
@@ -371,7 +327,7 @@ class DeviceDesignationManager:
         except Exception as e:
             self.logger.error(f"Error getting regular device IDs: {e}")
 
-        # Get cables (but don't add them if they're already in the device list)
+        # Get cables
         try:
             cable_ids_result = self.job.GetCableIds()
             if cable_ids_result:
@@ -381,21 +337,19 @@ class DeviceDesignationManager:
                     self.logger.info(f"E3 reports {count} cables")
 
                     if isinstance(cable_ids, tuple):
-                        # Filter out None values and duplicates
-                        cables = [cid for cid in cable_ids if cid is not None and cid not in all_devices]
+                        # Filter out None values
+                        cables = [cid for cid in cable_ids if cid is not None]
                         all_devices.extend(cables)
                     else:
-                        if cable_ids is not None and cable_ids not in all_devices:
+                        if cable_ids is not None:
                             all_devices.append(cable_ids)
                 else:
                     self.logger.warning(f"Unexpected cable IDs format: {type(cable_ids_result)}")
         except Exception as e:
             self.logger.error(f"Error getting cable IDs: {e}")
 
-        # Remove any remaining duplicates
-        all_devices = list(set(all_devices))
-
-        return all_devices
+        # Drop repeated ids (within either list or across both), keeping order
+        return list(dict.fromkeys(all_devices))
 
     def is_cable_device(self, device_id: int) -> bool:
         """
@@ -409,12 +363,48 @@ class DeviceDesignationManager:
         """
         try:
             self.device.SetId(device_id)
-            result = self.device.IsCable()
-            return result == 1
+            return self.device.IsCable() == 1
         except Exception as e:
-            self.logger.debug(f"Error checking if device {device_id} is cable: {e}")
+            self.logger.debug("Error checking if device %s is cable: %s", device_id, e)
             return False
 
+    def classify_device(self, device_id: int) -> Literal["terminal", "cable", "device"]:
+        """
+        Classify a device as a cable, a terminal or a regular device.
+
+        Selects the device once and reads IsCable(), IsTerminal() and
+        IsTerminalBlock() back to back instead of a SetId() per check, stopping
+        as soon as the answer is known.
+
+        Args:
+            device_id: Device ID
+
+        Returns:
+            "cable", "terminal" or "device"
+        """
+        if device_id in self._device_kinds:
+            return self._device_kinds[device_id]
+
+        try:
+            self.device.SetId(device_id)
+            is_cable = self.device.IsCable() == 1
+
+            # Cables win over terminals, so their terminal checks are skipped
+            terminal = False
+            if not is_cable:
+                terminal = self._check_terminal()
+                if terminal:
+                    self.logger.debug("Device %s identified as terminal device", device_id)
+        except Exception as e:
+            self.logger.debug("Error classifying device %s, checking individually: %s", device_id, e)
+            is_cable = self.is_cable_device(device_id)
+            terminal = not is_cable and self.is_terminal_device(device_id)
+
+        # Cables are checked first, as in the original two-step classification
+        kind = "cable" if is_cable else "terminal" if terminal else "device"
+        self._device_kinds[device_id] = kind
+        return kind
+
     def get_cable_position_info(self, device_id: int) -> Tuple[Optional[str], Optional[str], Optional[int]]:
         """
         Get position information for a cable using its first core/connection.
@@ -432,7 +422,7 @@ class DeviceDesignationManager:
             core_ids_result = self.device.GetCoreIds()
 
             if not core_ids_result:
-                self.logger.debug(f"No cores found for cable {device_id}")
+                self.logger.debug("No cores found for cable %s", device_id)
                 return None, None, None
 
             # Handle the result format - E3 returns (count, (core_id1, core_id2, ...))
@@ -447,7 +437,7 @@ class DeviceDesignationManager:
                             core_ids.append(cid)
 
             if not core_ids:
-                self.logger.debug(f"No valid cores found for cable {device_id}")
+                self.logger.debug("No valid cores found for cable %s", device_id)
                 return None, None, None
 
             # Try to get position from the first core
@@ -455,14 +445,14 @@ class DeviceDesignationManager:
                 try:
                     # Note: This would need a pin object, but for now we'll return basic info
                     # In a real implementation, you'd need to create a pin object and use it
-                    self.logger.debug(f"Cable {device_id} core {core_id} found")
+                    self.logger.debug("Cable %s core %s found", device_id, core_id)
                     return "Unknown", None, core_id
 
                 except Exception as e:
-                    self.logger.debug(f"Error getting position for cable {device_id} core {core_id}: {e}")
+                    self.logger.debug("Error getting position for cable %s core %s: %s", device_id, core_id, e)
                     continue
 
-            self.logger.debug(f"Could not determine position for cable {device_id}")
+            self.logger.debug("Could not determine position for cable %s", device_id)
             return None, None, None
 
         except Exception as e:
@@ -472,6 +462,10 @@ class DeviceDesignationManager:
     def process_devices(self):
         """Process all devices and cables in the project"""
         try:
+            # Start from fresh caches so edits made since the last run are seen
+            self._device_kinds.clear()
+            self._sheet_name_cache.clear()
+
             # Get all device IDs (including cables)
             actual_devices = self.get_all_device_and_cable_ids()
 
@@ -482,8 +476,7 @@ class DeviceDesignationManager:
             self.logger.info(f"Processing {len(actual_devices)} devices and cables")
 
             # Collect device data
-            device_data = {}
-            designations = {}  # base_designation -> [device_ids]
+            designations = defaultdict(list)  # base_designation -> [device_ids]
             devices_with_symbols = 0
             devices_without_symbols = 0
             terminal_devices_skipped = 0
@@ -493,14 +486,16 @@ class DeviceDesignationManager:
             # First pass: separate terminals and cables from other devices
             for device_id in actual_devices:
                 try:
+                    kind = self.classify_device(device_id)
+
                     # Check if this is a cable - skip it completely
-                    if self.is_cable_device(device_id):
+                    if kind == "cable":
                         cables_skipped += 1
                         self.logger.info(f"Device {device_id} identified as cable - skipping")
                         continue
 
                     # Check if this is a terminal device - skip it completely
-                    if self.is_terminal_device(device_id):
+                    if kind == "terminal":
                         terminal_devices_skipped += 1
                         self.logger.info(f"Device {device_id} identified as terminal device - skipping")
                         continue
@@ -525,18 +520,7 @@ class DeviceDesignationManager:
                         # Generate base designation
                         base_designation = self.generate_device_designation(letter_code, sheet, grid)
 
-                        # Store device data including the first symbol ID
-                        device_data[device_id] = {
-                            'letter_code': letter_code,
-                            'sheet': sheet,
-                            'grid': grid,
-                            'base_designation': base_designation,
-                            'first_symbol_id': first_symbol_id
-                        }
-
                         # Track designations for conflict resolution
-                        if base_designation not in designations:
-                            designations[base_designation] = []
                         designations[base_designation].append(device_id)
 
                         self.logger.info(f"Device {device_id}: {letter_code} at sheet {sheet}, grid {grid} -> {base_designation}")
@@ -553,15 +537,39 @@ class DeviceDesignationManager:
             self.logger.info(f"Found {devices_with_symbols} regular devices with placed symbols, {devices_without_symbols} devices without placed symbols")
 
             # Resolve conflicts and assign final designations for regular devices
-            final_designations = self.assign_suffix_for_conflicts(designations, device_data)
+            final_designations = self.assign_suffix_for_conflicts(designations)
 
-            # Update device designations for regular devices
+            # Update device designations for regular devices with SetName();
+            # per-device results are summarised below
             designation_success_count = 0
-            for device_id, final_designation in final_designations.items():
-                if self.update_device_designation(device_id, final_designation):
+            unchanged_count = 0
+            failed_updates = []
+            set_id = self.device.SetId
+            set_name = self.device.SetName
+            get_name = self.device.GetName
+            for device_id, final_designation in sorted(final_designations.items()):
+                try:
+                    set_id(device_id)
+                    # Re-runs mostly find the designation already correct;
+                    # skip the write (and E3's update work) for those
+                    if get_name() == final_designation:
+                        designation_success_count += 1
+                        unchanged_count += 1
+                        continue
+                    result = set_name(final_designation)
+                except Exception as e:
+                    self.logger.error(f"Error updating designation for device {device_id}: {e}")
+                    continue
+                if result > 0:
                     designation_success_count += 1
+                    self.logger.debug("Updated device %s designation to '%s'", device_id, final_designation)
+                else:
+                    failed_updates.append((device_id, result))
+
+            if failed_updates:
+                self.logger.warning(f"SetName() failed for {len(failed_updates)} devices: " + ", ".join(f"{device_id} (result {result})" for device_id, result in failed_updates))
 
-            self.logger.info(f"Successfully updated {designation_success_count} out of {len(final_designations)} device designations")
+            self.logger.info(f"Successfully updated {designation_success_count} out of {len(final_designations)} device designations ({unchanged_count} already up to date)")
             self.logger.info(f"Skipped {terminal_devices_skipped} terminal devices and {cables_skipped} cables (designations unchanged)")
 
         except Exception as e:
@@ -590,20 +598,24 @@ class DeviceDesignationManager:
             self.device = None
             self.symbol = None
             self.sheet = None
-            # Uninitialize COM
-            try:
-                pythoncom.CoUninitialize()
-            except:
-                pass
+            # Release the connection we opened, collecting any leftover COM
+            # proxies first; a shared one (e3_objects) is released by its owner
+            if self._session is not None:
+                gc.collect()
+                from .e3_connection_manager import release_e3_connection
+                release_e3_connection(self._session)
+                self._session = None
 
 
-def run_device_designation_automation(logger=None, e3_pid=None):
+def run_device_designation_automation(logger=None, e3_pid=None, e3_objects=None):
     """
     Main function to run device designation automation.
 
     Args:
         logger: Optional logger instance. If None, creates a default logger.
         e3_pid: Optional E3.series process ID. If None, will prompt user to select.
+        e3_objects: Optional objects dict from connect_to_e3_with_pid to reuse
+            instead of opening a new connection. The caller keeps ownership.
 
     Returns:
         bool: True if successful, False otherwise
@@ -621,7 +633,7 @@ def run_device_designation_automation(logger=None, e3_pid=None):
         logger = logging.getLogger(__name__)
 
     try:
-        manager = DeviceDesignationManager(logger, e3_pid)
+        manager = DeviceDesignationManager(logger, e3_pid, e3_objects)
         success = manager.run()
 
         if success:
@@ -24,10 +24,9 @@ import logging
 import sys
 from collections import defaultdict
 import e3series
-import pythoncom
 
 class TerminalPinNameSetter:
-    def __init__(self, logger=None, e3_pid=None):
+    def __init__(self, logger=None, e3_pid=None, e3_objects=None):
         self.app = None
         self.job = None
         self.device = None
@@ -36,20 +35,41 @@ class TerminalPinNameSetter:
         self.connection = None
         self.logger = logger or logging.getLogger(__name__)
         self.e3_pid = e3_pid
+        self.e3_objects = e3_objects
+        self._session = None  # connection opened by this instance (released in run)
+
+        # Per-run caches (each E3 lookup is a COM round-trip)
+        self._is_terminal_cache = {}
+        self._device_name_cache = {}
+        self._wire_number_by_segment = {}
+        self._pin_name_cache = {}
+        # Set by get_all_terminal_devices (see _get_bulk_terminal_ids)
+        self._bulk_terminal_ids = None
+        # Id each E3 object was last SetId() to, by attribute name (see _select)
+        self._current_ids = {}
+        # SetId/SetName callables used on the hot path (see _bind_fast_methods)
+        self._set_id_funcs = {}
+        self._pin_set_name = None
         
     def connect_to_e3(self):
         """Connect to E3 application using connection manager"""
         try:
-            # Get E3 PID if not already provided
-            if self.e3_pid is None:
-                from .e3_connection_manager import get_e3_connection_pid
-                self.e3_pid = get_e3_connection_pid(self.logger)
+            # Reuse a session opened by the caller (e.g. the GUI's "Run All")
+            if self.e3_objects is not None:
+                success, objects = True, self.e3_objects
+            else:
+                # Get E3 PID if not already provided
                 if self.e3_pid is None:
-                    return False
-
-            # Connect using the PID
-            from .e3_connection_manager import connect_to_e3_with_pid
-            success, objects = connect_to_e3_with_pid(self.e3_pid, self.logger)
+                    from .e3_connection_manager import get_e3_connection_pid
+                    self.e3_pid = get_e3_connection_pid(self.logger)
+                    if self.e3_pid is None:
+                        return False
+
+                # Connect using the PID
+                from .e3_connection_manager import connect_to_e3_with_pid
+                success, objects = connect_to_e3_with_pid(self.e3_pid, self.logger)
+                if success:
+                    self._session = objects
             if success:
                 self.app = objects['app']
                 self.job = objects['job']
@@ -57,6 +77,7 @@ class TerminalPinNameSetter:
                 self.pin = objects['pin']
                 self.net_segment = objects['net_segment']
                 self.connection = objects['connection']
+                self._bind_fast_methods()
                 return True
             else:
                 return False
@@ -64,6 +85,57 @@ class TerminalPinNameSetter:
             self.logger.error(f"Failed to connect to E3: {e}")
             return False
     
+    def _bind_fast_methods(self):
+        """
+        Prepare the SetId/SetName callables used for every pin.
+
+        The wrapper methods are looked up once per connection instead of on
+        every call.
+        """
+        self._set_id_funcs = {
+            'device': self.device.SetId,
+            'pin': self.pin.SetId,
+            'net_segment': self.net_segment.SetId,
+        }
+        self._pin_set_name = self.pin.SetName
+
+    @staticmethod
+    def _unpack_ids(result):
+        """
+        Turn an E3 "(count, ids)" result into a tuple of IDs.
+
+        Args:
+            result: Return value of an E3 Get...Ids() call
+
+        Returns:
+            Tuple of IDs without None/0 entries (empty if E3 returned nothing)
+        """
+        if not isinstance(result, tuple) or len(result) < 2:
+            return ()
+        ids = result[1]
+        if isinstance(ids, tuple):
+            return tuple(filter(None, ids))
+        return (ids,) if ids else ()
+
+    def _select(self, name: str, obj_id: int):
+        """
+        Point one of the E3 objects at obj_id, skipping the SetId() COM call
+        when it already points there.
+
+        Args:
+            name: Attribute name of the E3 object ('device', 'pin', 'net_segment')
+            obj_id: ID to select
+        """
+        if self._current_ids.get(name) == obj_id:
+            return
+        try:
+            set_id = self._set_id_funcs.get(name) or getattr(self, name).SetId
+            set_id(obj_id)
+        except Exception:
+            self._current_ids.pop(name, None)
+            raise
+        self._current_ids[name] = obj_id
+
     def is_terminal_device(self, device_id: int) -> bool:
         """
         Check if a device is a terminal device using E3 API methods.
@@ -74,10 +146,17 @@ class TerminalPinNameSetter:
         Returns:
             True if device is a terminal or terminal block, False otherwise
         """
+        if device_id in self._is_terminal_cache:
+            return self._is_terminal_cache[device_id]
+        if self._bulk_terminal_ids is not None and device_id in self._bulk_terminal_ids:
+            return True
+
         try:
-            self.device.SetId(device_id)
+            self._select('device', device_id)
             
             # Use official E3 API methods to check if device is a terminal
+            # (GetTerminalIds only answers the positive case, so devices
+            # outside that list are still checked individually)
             is_terminal = self.device.IsTerminal()
             is_terminal_block = self.device.IsTerminalBlock()
             
@@ -86,8 +165,10 @@ class TerminalPinNameSetter:
             
             if result:
                 device_name = self.device.GetName()
-                self.logger.debug(f"Device {device_name} ({device_id}) identified as terminal device (IsTerminal={is_terminal}, IsTerminalBlock={is_terminal_block})")
+                self._device_name_cache[device_id] = device_name
+                self.logger.debug("Device %s (%s) identified as terminal device (IsTerminal=%s, IsTerminalBlock=%s)", device_name, device_id, is_terminal, is_terminal_block)
             
+            self._is_terminal_cache[device_id] = result
             return result
             
         except Exception as e:
@@ -98,60 +179,46 @@ class TerminalPinNameSetter:
         """Get all terminal device IDs in the project"""
         try:
             # Get all device IDs
-            device_ids_result = self.job.GetAllDeviceIds()
+            device_ids = self._unpack_ids(self.job.GetAllDeviceIds())
             
-            if not device_ids_result or len(device_ids_result) < 2:
+            if not device_ids:
                 self.logger.warning("No devices found in project")
                 return []
             
-            device_count = device_ids_result[0]
-            device_ids = device_ids_result[1]
-            
-            if device_count == 0:
-                self.logger.warning("No devices found in project")
-                return []
-            
-            # Convert to list if single device
-            if not isinstance(device_ids, tuple):
-                device_ids = [device_ids] if device_ids is not None else []
-            else:
-                device_ids = [did for did in device_ids if did is not None]
-            
             # Filter for terminal devices only
+            self._bulk_terminal_ids = self._get_bulk_terminal_ids()
             terminal_devices = []
             for device_id in device_ids:
                 if self.is_terminal_device(device_id):
                     terminal_devices.append(device_id)
             
-            self.logger.info(f"Found {len(terminal_devices)} terminal devices out of {device_count} total devices")
+            self.logger.info("Found %s terminal devices out of %s total devices", len(terminal_devices), len(device_ids))
             return terminal_devices
             
         except Exception as e:
             self.logger.error(f"Error getting terminal devices: {e}")
             return []
     
+    def _get_bulk_terminal_ids(self):
+        """
+        Get the IDs of all terminals with a single Job.GetTerminalIds() call.
+
+        Returns:
+            Set of terminal device IDs, or None if the connected E3 version does
+            not provide GetTerminalIds or the call fails
+        """
+        try:
+            return set(self._unpack_ids(self.job.GetTerminalIds()))
+
+        except Exception as e:
+            self.logger.debug("GetTerminalIds() not usable, checking devices individually: %s", e)
+            return None
+
     def get_device_pins(self, device_id: int):
         """Get all pin IDs for a device"""
         try:
-            self.device.SetId(device_id)
-            pin_ids_result = self.device.GetPinIds()
-            
-            if not pin_ids_result or len(pin_ids_result) < 2:
-                return []
-            
-            pin_count = pin_ids_result[0]
-            pin_ids = pin_ids_result[1]
-            
-            if pin_count == 0:
-                return []
-            
-            # Convert to list if single pin
-            if not isinstance(pin_ids, tuple):
-                pin_ids = [pin_ids] if pin_ids is not None else []
-            else:
-                pin_ids = [pid for pid in pin_ids if pid is not None]
-            
-            return pin_ids
+            self._select('device', device_id)
+            return self._unpack_ids(self.device.GetPinIds())
             
         except Exception as e:
             self.logger.error(f"Error getting pins for device {device_id}: {e}")
@@ -160,25 +227,8 @@ class TerminalPinNameSetter:
     def get_pin_net_segments(self, pin_id: int):
         """Get net segment IDs connected to a pin"""
         try:
-            self.pin.SetId(pin_id)
-            net_segment_ids_result = self.pin.GetNetSegmentIds()
-            
-            if not net_segment_ids_result or len(net_segment_ids_result) < 2:
-                return []
-            
-            net_segment_count = net_segment_ids_result[0]
-            net_segment_ids = net_segment_ids_result[1]
-            
-            if net_segment_count == 0:
-                return []
-            
-            # Convert to list if single net segment
-            if not isinstance(net_segment_ids, tuple):
-                net_segment_ids = [net_segment_ids] if net_segment_ids is not None else []
-            else:
-                net_segment_ids = [nsid for nsid in net_segment_ids if nsid is not None]
-            
-            return net_segment_ids
+            self._select('pin', pin_id)
+            return self._unpack_ids(self.pin.GetNetSegmentIds())
             
         except Exception as e:
             self.logger.error(f"Error getting net segments for pin {pin_id}: {e}")
@@ -186,15 +236,22 @@ class TerminalPinNameSetter:
     
     def get_wire_number_from_net_segment(self, net_segment_id: int):
         """Get wire number attribute from a net segment"""
+        # Segments are often shared by several terminal pins (e.g. jumpered terminals)
+        if net_segment_id in self._wire_number_by_segment:
+            return self._wire_number_by_segment[net_segment_id]
+
         try:
-            self.net_segment.SetId(net_segment_id)
+            self._select('net_segment', net_segment_id)
             wire_number = self.net_segment.GetAttributeValue("Wire number")
             
             # Check if wire number is empty or None
             if not wire_number or wire_number.strip() == "":
-                return None
-            
-            return wire_number.strip()
+                wire_number = None
+            else:
+                wire_number = wire_number.strip()
+
+            self._wire_number_by_segment[net_segment_id] = wire_number
+            return wire_number
             
         except Exception as e:
             self.logger.error(f"Error getting wire number from net segment {net_segment_id}: {e}")
@@ -203,37 +260,41 @@ class TerminalPinNameSetter:
     def set_pin_name(self, pin_id: int, new_name: str):
         """Set the name of a pin"""
         try:
-            self.pin.SetId(pin_id)
-            old_name = self.pin.GetName()
+            old_name = self._pin_name_cache.get(pin_id)
+            if old_name is None:
+                self._select('pin', pin_id)
+                old_name = self.pin.GetName()
             
             # Only update if the name is different
             if old_name != new_name:
-                result = self.pin.SetName(new_name)
+                self._select('pin', pin_id)
+                result = (self._pin_set_name or self.pin.SetName)(new_name)
                 if result == 1:  # Success
-                    self.logger.info(f"Updated pin {pin_id}: '{old_name}' -> '{new_name}'")
+                    self._pin_name_cache[pin_id] = new_name
+                    self.logger.info("Updated pin %s: '%s' -> '%s'", pin_id, old_name, new_name)
                     return True
                 else:
                     self.logger.warning(f"Failed to set name for pin {pin_id}: SetName() returned {result}")
                     return False
             else:
-                self.logger.debug(f"Pin {pin_id} already has correct name: '{new_name}'")
+                self.logger.debug("Pin %s already has correct name: '%s'", pin_id, new_name)
                 return True
                 
         except Exception as e:
             self.logger.error(f"Error setting name for pin {pin_id}: {e}")
             return False
     
-    def process_terminal_pin(self, device_id: int, pin_id: int):
-        """Process a single terminal pin to set its name to the wire number"""
+    def get_pin_wire_number(self, pin_id: int):
+        """Get the wire number a terminal pin should be named after, or None"""
         try:
             # Get net segments connected to this pin
             net_segment_ids = self.get_pin_net_segments(pin_id)
             
             if not net_segment_ids:
-                self.logger.debug(f"Pin {pin_id} has no connected net segments")
-                return False
+                self.logger.debug("Pin %s has no connected net segments", pin_id)
+                return None
             
-            # Try to get wire number from the first net segment
+            # Use the first net segment that carries a wire number
             # In most cases, terminal pins should only have one net segment
             wire_number = None
             for net_segment_id in net_segment_ids:
@@ -242,20 +303,35 @@ class TerminalPinNameSetter:
                     break
             
             if not wire_number:
-                self.logger.debug(f"Pin {pin_id} has no wire number in connected net segments")
-                return False
+                self.logger.debug("Pin %s has no wire number in connected net segments", pin_id)
+                return None
             
-            # Set the pin name to the wire number
-            success = self.set_pin_name(pin_id, wire_number)
-            return success
+            return wire_number
             
         except Exception as e:
             self.logger.error(f"Error processing terminal pin {pin_id}: {e}")
+            return None
+
+    def process_terminal_pin(self, device_id: int, pin_id: int):
+        """Process a single terminal pin to set its name to the wire number"""
+        wire_number = self.get_pin_wire_number(pin_id)
+        if not wire_number:
             return False
 
+        # Set the pin name to the wire number
+        return self.set_pin_name(pin_id, wire_number)
+
     def process_all_terminal_pins(self):
         """Process all terminal pins in the project"""
         try:
+            # Start from fresh caches so edits made since the last run are seen
+            self._is_terminal_cache.clear()
+            self._device_name_cache.clear()
+            self._wire_number_by_segment.clear()
+            self._pin_name_cache.clear()
+            self._current_ids.clear()
+            self._bulk_terminal_ids = None
+
             terminal_devices = self.get_all_terminal_devices()
 
             if not terminal_devices:
@@ -265,33 +341,63 @@ class TerminalPinNameSetter:
             total_pins_processed = 0
             total_pins_updated = 0
 
+            # Read everything first, then write all pin names in one batch
+            pending_updates = []  # (device_id, pin_id, wire_number)
+            device_pin_counts = {}  # device_id -> (device_name, pin count)
+
             for device_id in terminal_devices:
                 try:
-                    self.device.SetId(device_id)
-                    device_name = self.device.GetName()
+                    device_name = self._device_name_cache.get(device_id)
+                    if device_name is None:
+                        self._select('device', device_id)
+                        device_name = self.device.GetName()
+                        self._device_name_cache[device_id] = device_name
 
                     pin_ids = self.get_device_pins(device_id)
 
                     if not pin_ids:
-                        self.logger.debug(f"Terminal device {device_name} ({device_id}) has no pins")
+                        self.logger.debug("Terminal device %s (%s) has no pins", device_name, device_id)
                         continue
 
-                    self.logger.info(f"Processing terminal device {device_name} ({device_id}) with {len(pin_ids)} pins")
+                    self.logger.info("Processing terminal device %s (%s) with %s pins", device_name, device_id, len(pin_ids))
 
-                    device_pins_updated = 0
+                    device_pin_counts[device_id] = (device_name, len(pin_ids))
                     for pin_id in pin_ids:
                         total_pins_processed += 1
-                        if self.process_terminal_pin(device_id, pin_id):
-                            total_pins_updated += 1
-                            device_pins_updated += 1
-
-                    self.logger.info(f"Updated {device_pins_updated}/{len(pin_ids)} pins for device {device_name}")
+                        wire_number = self.get_pin_wire_number(pin_id)
+                        if wire_number:
+                            # The pin is still selected from the segment lookup, so
+                            # its current name costs no extra SetId here
+                            self._select('pin', pin_id)
+                            self._pin_name_cache[pin_id] = self.pin.GetName()
+                            pending_updates.append((device_id, pin_id, wire_number))
 
                 except Exception as e:
                     self.logger.error(f"Error processing terminal device {device_id}: {e}")
                     continue
 
-            self.logger.info(f"Terminal pin processing complete: {total_pins_updated}/{total_pins_processed} pins updated")
+            # Pins already named after their wire number need no COM call at all
+            device_pins_updated = defaultdict(int)
+            renames = []
+            for device_id, pin_id, wire_number in pending_updates:
+                if self._pin_name_cache.get(pin_id) == wire_number:
+                    total_pins_updated += 1
+                    device_pins_updated[device_id] += 1
+                else:
+                    renames.append((device_id, pin_id, wire_number))
+
+            self.logger.info("%s pins already match their wire number, %s to rename", len(pending_updates) - len(renames), len(renames))
+
+            if renames:
+                for device_id, pin_id, wire_number in renames:
+                    if self.set_pin_name(pin_id, wire_number):
+                        total_pins_updated += 1
+                        device_pins_updated[device_id] += 1
+
+            for device_id, (device_name, pin_count) in device_pin_counts.items():
+                self.logger.info("Updated %s/%s pins for device %s", device_pins_updated[device_id], pin_count, device_name)
+
+            self.logger.info("Terminal pin processing complete: %s/%s pins updated", total_pins_updated, total_pins_processed)
 
         except Exception as e:
             self.logger.error(f"Error in process_all_terminal_pins: {e}")
@@ -314,20 +420,32 @@ class TerminalPinNameSetter:
             self.logger.error(f"Error in main execution: {e}")
             return False
         finally:
-            # Uninitialize COM
-            try:
-                pythoncom.CoUninitialize()
-            except:
-                pass
-
-
-def run_terminal_pin_name_automation(logger=None, e3_pid=None):
+            # Clean up E3.series objects
+            self.app = None
+            self.job = None
+            self.device = None
+            self.pin = None
+            self.net_segment = None
+            self.connection = None
+            self._set_id_funcs = {}
+            self._pin_set_name = None
+            # Release the connection we opened; a shared one (e3_objects) is
+            # released by its owner
+            if self._session is not None:
+                from .e3_connection_manager import release_e3_connection
+                release_e3_connection(self._session)
+                self._session = None
+
+
+def run_terminal_pin_name_automation(logger=None, e3_pid=None, e3_objects=None):
     """
     Main function to run terminal pin name automation.
 
     Args:
         logger: Optional logger instance. If None, creates a default logger.
         e3_pid: Optional E3.series process ID. If None, will prompt user to select.
+        e3_objects: Optional objects dict from connect_to_e3_with_pid to reuse
+            instead of opening a new connection. The caller keeps ownership.
 
     Returns:
         bool: True if successful, False otherwise
@@ -344,7 +462,7 @@ def run_terminal_pin_name_automation(logger=None, e3_pid=None):
         )
         logger = logging.getLogger(__name__)
 
-    setter = TerminalPinNameSetter(logger, e3_pid)
+    setter = TerminalPinNameSetter(logger, e3_pid, e3_objects)
     success = setter.run()
 
     if success:
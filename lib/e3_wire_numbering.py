@@ -27,43 +27,149 @@ Updated: 2025-07-11 - Converted to library module for GUI integration
 
 import e3series
 import logging
+import re
+import string
 import sys
-import pythoncom
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from typing import NamedTuple
+
+# Suffixes for signals sharing a base wire number: A..Z, then AA..ZZ
+_SUFFIXES = tuple(string.ascii_uppercase) + tuple(a + b for a in string.ascii_uppercase for b in string.ascii_uppercase)
+
+# FixWireName values that count as "not set"
+_FALSY = frozenset(('', '0', 'false', 'no'))
+
+# Wire number = {page digits}{grid letters}{grid digits}{rest}, e.g. "12B3" or "3A10x"
+_WIRE_RE = re.compile(r'(\d*)([^\W\d_]*)(\d*)(.*)', re.DOTALL)
+
+
+@lru_cache(maxsize=4096)
+def _wire_sort_key(wire_num, _match=_WIRE_RE.match):
+    """Sort key comparing page and grid numbers numerically (see wire_number_sort_key)"""
+    try:
+        if wire_num.isascii():
+            page, grid_alpha, grid_num, rest = _match(wire_num).groups()
+            return (int(page or 0), grid_alpha, int(grid_num or 0), rest)
+
+        # Beyond ASCII the regex classes differ from str.isdigit/isalpha
+        # (e.g. '²', '½'), so those are split character by character
+        return _split_wire_number(wire_num)
+
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Error parsing wire number '{wire_num}' for sorting: {e}")
+        # Fallback to lexicographic sorting for this wire number
+        return (999999, 'ZZZ', 999999, wire_num)
+
+
+def _split_wire_number(wire_num):
+    """(page, grid letters, grid number, rest) using str.isdigit/isalpha"""
+    end = len(wire_num)
+
+    # Numeric page part
+    i = 0
+    while i < end and wire_num[i].isdigit():
+        i += 1
+
+    # Grid: leading letters, then numbers; the rest is trailing text
+    j = i
+    while j < end and wire_num[j].isalpha():
+        j += 1
+    k = j
+    while k < end and wire_num[k].isdigit():
+        k += 1
+
+    page = wire_num[:i]
+    grid_num = wire_num[j:k]
+    return (int(page) if page else 0, wire_num[i:j], int(grid_num) if grid_num else 0, wire_num[k:])
+
+
+@lru_cache(maxsize=4096)
+def _grid_position(grid_desc, column, row):
+    """Grid position from a grid description or column/row (see extract_grid_position)"""
+    # If we have grid_desc in format "/sheet.grid", extract the grid part
+    if grid_desc and "." in grid_desc:
+        return grid_desc.rpartition(".")[2]
+
+    # If we have column and row, combine them
+    if column and row:
+        return f"{column}{row}"
+
+    # Fallback to just column or row if available
+    return column or row or "UNKNOWN"
+
+
+@lru_cache(maxsize=4096)
+def _wire_number(page_number, grid_position):
+    """Wire number for a page and grid position (see calculate_wire_number)"""
+    # Handle empty or None page numbers
+    if not page_number or page_number.strip() == "":
+        page_num = "0"
+    else:
+        page_num = str(page_number).strip()
+
+    # Format: page_number + grid_position
+    return f"{page_num}{grid_position}"
+
+
+class _WireDatum(NamedTuple):
+    """Candidate wire number for one pin of a connection"""
+    wire_number: str
+    x_coord: float
+    y_coord: float
+    sheet_id: int
+    pin_id: int
+    sort_key: tuple  # _wire_sort_key(wire_number)
+
 
 class WireNumberAssigner:
-    def __init__(self, logger=None, e3_pid=None):
+    def __init__(self, logger=None, e3_pid=None, e3_objects=None):
         self.app = None
         self.job = None
         self.connection = None
         self.pin = None
         self.sheet = None
-        self.signal = None
         self.net = None
         self.net_segment = None
         self.symbol = None
         self.logger = logger or logging.getLogger(__name__)
         self.e3_pid = e3_pid
+        self.e3_objects = e3_objects
+        self._session = None  # connection opened by this instance (released in run)
+
+        # Per-run caches: pin_id -> location tuple, sheet_id -> page name
+        self._pin_loc_cache = {}
+        self._sheet_name_cache = {}
+        self._net_fix_cache = {}  # net_id -> whether FixWireName is set
+        # Id each E3 object was last SetId() to, by attribute name (see _select)
+        self._current_ids = {}
+        self._conn_cache = {}  # connection_id -> see _load_connection
         
     def connect_to_e3(self):
         """Connect to E3 application using connection manager"""
         try:
-            # Get E3 PID if not already provided
-            if self.e3_pid is None:
-                from .e3_connection_manager import get_e3_connection_pid
-                self.e3_pid = get_e3_connection_pid(self.logger)
+            # Reuse a session opened by the caller (e.g. the GUI's "Run All")
+            if self.e3_objects is not None:
+                success, objects = True, self.e3_objects
+            else:
+                # Get E3 PID if not already provided
                 if self.e3_pid is None:
-                    return False
-
-            # Connect using the PID
-            from .e3_connection_manager import connect_to_e3_with_pid
-            success, objects = connect_to_e3_with_pid(self.e3_pid, self.logger)
+                    from .e3_connection_manager import get_e3_connection_pid
+                    self.e3_pid = get_e3_connection_pid(self.logger)
+                    if self.e3_pid is None:
+                        return False
+
+                # Connect using the PID
+                from .e3_connection_manager import connect_to_e3_with_pid
+                success, objects = connect_to_e3_with_pid(self.e3_pid, self.logger)
+                if success:
+                    self._session = objects
             if success:
                 self.app = objects['app']
                 self.job = objects['job']
                 self.connection = objects['connection']
                 self.pin = objects['pin']
                 self.sheet = objects['sheet']
-                self.signal = objects['signal']
                 self.net = objects['net']
                 self.net_segment = objects['net_segment']
                 self.symbol = objects['symbol']
@@ -74,10 +180,30 @@ class WireNumberAssigner:
             self.logger.error(f"Failed to connect to E3: {e}")
             return False
     
+    def _select(self, name, obj_id):
+        """Point one of the E3 objects at obj_id, skipping SetId() if it already points there"""
+        if self._current_ids.get(name) == obj_id:
+            return
+        try:
+            getattr(self, name).SetId(obj_id)
+        except Exception:
+            self._current_ids.pop(name, None)
+            raise
+        self._current_ids[name] = obj_id
+
     def get_pin_location_info(self, pin_id):
         """Get location information for a pin"""
+        # Pins shared by several connections are only looked up once, including
+        # pins without a location (so their warnings are logged once, too)
+        location = self._pin_loc_cache.get(pin_id)
+        if location is None:
+            location = self._pin_loc_cache[pin_id] = self._lookup_pin_location(pin_id)
+        return location
+
+    def _lookup_pin_location(self, pin_id):
+        """Read a pin's location from E3 (see get_pin_location_info)"""
         try:
-            self.pin.SetId(pin_id)
+            self._select('pin', pin_id)
 
             # Get schema location - E3 API returns (sheet_id, x, y, grid_desc, column, row)
             try:
@@ -99,13 +225,15 @@ class WireNumberAssigner:
                 return None, None, None, None, None
 
             if not sheet_id or sheet_id <= 0:
-                self.logger.debug(f"Pin {pin_id} has no valid schema location (sheet_id: {sheet_id})")
+                self.logger.debug("Pin %s has no valid schema location (sheet_id: %s)", pin_id, sheet_id)
                 return None, None, None, None, None
 
 
             try:
-                self.sheet.SetId(sheet_id)
-                page_number = self.sheet.GetName()
+                page_number = self._sheet_name_cache.get(sheet_id)
+                if page_number is None:
+                    self._select('sheet', sheet_id)
+                    page_number = self._sheet_name_cache[sheet_id] = self.sheet.GetName()
             except Exception as e:
                 self.logger.error(f"Error getting sheet assignment for sheet {sheet_id}: {e}")
                 page_number = "UNKNOWN"
@@ -113,7 +241,7 @@ class WireNumberAssigner:
             # Extract grid position from grid_desc or use column/row
             grid_position = self.extract_grid_position(grid_desc, column, row)
 
-            self.logger.debug(f"Pin {pin_id}: Sheet {sheet_id}, Page {page_number}, Grid {grid_position}, X={x_coord}, Y={y_coord}")
+            self.logger.debug("Pin %s: Sheet %s, Page %s, Grid %s, X=%s, Y=%s", pin_id, sheet_id, page_number, grid_position, x_coord, y_coord)
 
             return page_number, grid_position, sheet_id, x_coord, y_coord
 
@@ -123,143 +251,90 @@ class WireNumberAssigner:
     
     def extract_grid_position(self, grid_desc, column, row):
         """Extract grid position from grid description or column/row"""
-        try:
-            # If we have grid_desc in format "/sheet.grid", extract the grid part
-            if grid_desc and "." in grid_desc:
-                grid_part = grid_desc.split(".")[-1]
-                return grid_part
-
-            # If we have column and row, combine them
-            if column and row:
-                return f"{column}{row}"
-
-            # Fallback to just column or row if available
-            if column:
-                return column
-            if row:
-                return row
-
-            return "UNKNOWN"
-
-        except Exception as e:
-            self.logger.error(f"Error extracting grid position: {e}")
-            return "UNKNOWN"
+        # Many pins share a grid cell, so the parse is memoized
+        return _grid_position(grid_desc, column, row)
 
     def wire_number_sort_key(self, wire_num):
-        """Create a sort key that handles numeric page and grid comparison"""
-        try:
-            # Extract page and grid parts from wire number
-            # Wire number format is: {page_number}{grid_position}
-            # We need to separate numeric page from alphanumeric grid
-
-            # Find where the page number ends and grid starts
-            # Page should be numeric, grid can be alphanumeric
-            page_part = ""
-            grid_part = ""
-
-            i = 0
-            # Extract numeric page part
-            while i < len(wire_num) and wire_num[i].isdigit():
-                page_part += wire_num[i]
-                i += 1
-
-            # Rest is grid part
-            grid_part = wire_num[i:]
-
-            # Convert page to int for proper numeric sorting, default to 0 if empty
-            page_num = int(page_part) if page_part else 0
-
-            # For grid part, we need to handle complex patterns like:
-            # "A", "A1", "A10", "B2", "C1", etc.
-            # We'll break it down into: leading_letters + numbers + trailing_letters
-
-            grid_leading_alpha = ""
-            grid_num_part = ""
-            grid_trailing_alpha = ""
-
-            j = 0
-            # Extract leading letters
-            while j < len(grid_part) and grid_part[j].isalpha():
-                grid_leading_alpha += grid_part[j]
-                j += 1
-
-            # Extract numbers
-            while j < len(grid_part) and grid_part[j].isdigit():
-                grid_num_part += grid_part[j]
-                j += 1
-
-            # Rest is trailing letters
-            grid_trailing_alpha = grid_part[j:]
-
-            grid_num = int(grid_num_part) if grid_num_part else 0
-
-            return (page_num, grid_leading_alpha, grid_num, grid_trailing_alpha)
+        """
+        Create a sort key that handles numeric page and grid comparison.
 
-        except Exception as e:
-            self.logger.warning(f"Error parsing wire number '{wire_num}' for sorting: {e}")
-            # Fallback to lexicographic sorting for this wire number
-            return (999999, 'ZZZ', 999999, wire_num)
+        Wire number format is {page_number}{grid_position}; the key is
+        (page, grid leading letters, grid number, rest) with the page and grid
+        numbers as ints, so "10A1" sorts after "9A1" and "1A10" after "1A2".
+        """
+        return _wire_sort_key(wire_num)
     
     def calculate_wire_number(self, page_number, grid_position):
         """Calculate wire number from page and grid position"""
         try:
-            # Handle empty or None page numbers
-            if not page_number or page_number.strip() == "":
-                page_num = "0"
-            else:
-                page_num = str(page_number).strip()
-            
-            # Format: page_number + grid_position
-            wire_number = f"{page_num}{grid_position}"
-            return wire_number
-            
+            # Pins on the same grid cell repeat the same inputs, so this is memoized
+            return _wire_number(page_number, grid_position)
+
         except Exception as e:
             self.logger.error(f"Error calculating wire number: {e}")
             return "ERROR"
     
+    def _load_connection(self, connection_id):
+        """
+        Read a connection's signal name, pin IDs and net segment IDs.
+
+        The connection is selected once and all three values are read together;
+        the result is cached for the rest of the run.
+
+        Returns:
+            dict with 'signal_name', 'pin_ids' and 'net_segment_ids'
+        """
+        data = self._conn_cache.get(connection_id)
+        if data is None:
+            self._select('connection', connection_id)
+            data = {
+                'signal_name': self.connection.GetSignalName(),
+                # E3 API returns (count, tuple_of_ids) for both
+                'pin_ids': self._unpack_ids(self.connection.GetPinIds()),
+                'net_segment_ids': self._unpack_ids(self.connection.GetNetSegmentIds()),
+            }
+            self._conn_cache[connection_id] = data
+        return data
+
     def get_connection_wire_numbers_and_positions(self, connection_id):
         """Get potential wire numbers and positions for both ends of a connection"""
+        return [
+            {
+                'wire_number': data.wire_number,
+                'x_coord': data.x_coord,
+                'y_coord': data.y_coord,
+                'sheet_id': data.sheet_id,
+                'pin_id': data.pin_id
+            }
+            for data in self._connection_wire_data(connection_id)
+        ]
+
+    def _connection_wire_data(self, connection_id):
+        """Candidate wire numbers of a connection as _WireDatum tuples (used by process_connections)"""
         try:
-            self.connection.SetId(connection_id)
-
             # Get pin IDs for this connection
-            pin_ids_result = self.connection.GetPinIds()
-            if not pin_ids_result:
+            actual_pin_ids = self._load_connection(connection_id)['pin_ids']
+            if not actual_pin_ids:
                 self.logger.warning(f"Connection {connection_id} has no pins")
                 return []
 
             wire_data = []
 
-            # E3 API returns (count, tuple_of_ids) for pin IDs too
-            actual_pin_ids = []
-            if isinstance(pin_ids_result, tuple) and len(pin_ids_result) >= 2:
-                _ = pin_ids_result[0]  # count (not used)
-                pin_ids = pin_ids_result[1]
-
-                if isinstance(pin_ids, tuple):
-                    # Filter out None values and invalid pin IDs (like 0)
-                    actual_pin_ids = [pid for pid in pin_ids if pid is not None and pid != 0]
-                else:
-                    if pin_ids is not None and pin_ids != 0:
-                        actual_pin_ids = [pin_ids]
-            else:
-                self.logger.warning(f"Unexpected pin IDs format for connection {connection_id}: {type(pin_ids_result)}")
-                return []
-
-            self.logger.debug(f"Connection {connection_id} has {len(actual_pin_ids)} valid pins")
+            self.logger.debug("Connection %s has %s valid pins", connection_id, len(actual_pin_ids))
 
             for pin_id in actual_pin_ids:
                 page_number, grid_position, sheet_id, x_coord, y_coord = self.get_pin_location_info(pin_id)
                 if page_number is not None and grid_position is not None:
                     wire_number = self.calculate_wire_number(page_number, grid_position)
-                    wire_data.append({
-                        'wire_number': wire_number,
-                        'x_coord': x_coord if x_coord is not None else 0,
-                        'y_coord': y_coord if y_coord is not None else 0,
-                        'sheet_id': sheet_id,
-                        'pin_id': pin_id
-                    })
-                    self.logger.debug(f"Pin {pin_id}: Page {page_number}, Grid {grid_position} -> Wire {wire_number}, X={x_coord}, Y={y_coord}")
+                    wire_data.append(_WireDatum(
+                        wire_number,
+                        x_coord if x_coord is not None else 0,
+                        y_coord if y_coord is not None else 0,
+                        sheet_id,
+                        pin_id,
+                        _wire_sort_key(wire_number)
+                    ))
+                    self.logger.debug("Pin %s: Page %s, Grid %s -> Wire %s, X=%s, Y=%s", pin_id, page_number, grid_position, wire_number, x_coord, y_coord)
 
             return wire_data
 
@@ -277,33 +352,13 @@ class WireNumberAssigner:
         if not wire_numbers:
             return None
 
-        # Sort wire numbers using the custom key that handles numeric page and grid comparison
-        sorted_numbers = sorted(wire_numbers, key=self.wire_number_sort_key)
-        return sorted_numbers[0]
+        # Use the custom key that handles numeric page and grid comparison
+        return min(wire_numbers, key=_wire_sort_key)
 
     def get_net_segments_for_connection(self, connection_id):
         """Get all net segment IDs for a given connection"""
         try:
-            self.connection.SetId(connection_id)
-            net_segment_ids_result = self.connection.GetNetSegmentIds()
-
-            if not net_segment_ids_result:
-                return []
-
-            actual_net_segments = []
-            if isinstance(net_segment_ids_result, tuple) and len(net_segment_ids_result) >= 2:
-                _ = net_segment_ids_result[0]  # count (not used)
-                net_segment_ids = net_segment_ids_result[1]
-
-                if isinstance(net_segment_ids, tuple):
-                    actual_net_segments = [nsid for nsid in net_segment_ids if nsid is not None and nsid != 0]
-                else:
-                    if net_segment_ids is not None and net_segment_ids != 0:
-                        actual_net_segments = [net_segment_ids]
-            else:
-                self.logger.warning(f"Unexpected net segment IDs format for connection {connection_id}: {type(net_segment_ids_result)}")
-
-            return actual_net_segments
+            return list(self._load_connection(connection_id)['net_segment_ids'])
 
         except Exception as e:
             self.logger.error(f"Error getting net segments for connection {connection_id}: {e}")
@@ -312,48 +367,55 @@ class WireNumberAssigner:
     def has_fix_wire_name_attribute(self, connection_id):
         """Check if the net for this connection has the FixWireName attribute set"""
         try:
-            self.connection.SetId(connection_id)
+            self._select('connection', connection_id)
+        except Exception as e:
+            self.logger.error(f"Error checking FixWireName attribute for connection {connection_id}: {e}")
+            return False
+        return self._selected_connection_has_fix_wire_name(connection_id)
+
+    def _selected_connection_has_fix_wire_name(self, connection_id):
+        """FixWireName check for the connection self.connection already points at"""
+        try:
             net_id = self.connection.GetNetId()
 
             # Check if we got a valid net ID
             if net_id <= 0:
-                self.logger.debug(f"Connection {connection_id} has no valid net ID ({net_id}) - processing normally")
+                self.logger.debug("Connection %s has no valid net ID (%s) - processing normally", connection_id, net_id)
                 return False
 
+            # Connections on the same net share the answer
+            if net_id in self._net_fix_cache:
+                return self._net_fix_cache[net_id]
+
             # Set the net object to this net and check for FixWireName attribute
-            self.net.SetId(net_id)
+            self._select('net', net_id)
             fix_wire_name = self.net.GetAttributeValue("FixWireName")
 
             # Check if the attribute exists and has a truthy value
-            if fix_wire_name and str(fix_wire_name).strip().lower() not in ['', '0', 'false', 'no']:
-                self.logger.debug(f"Connection {connection_id} has FixWireName attribute set to '{fix_wire_name}' on net {net_id} - skipping")
-                return True
+            is_fixed = bool(fix_wire_name) and str(fix_wire_name).strip().lower() not in _FALSY
+            if is_fixed:
+                self.logger.debug("Connection %s has FixWireName attribute set to '%s' on net %s - skipping", connection_id, fix_wire_name, net_id)
 
-            return False
+            self._net_fix_cache[net_id] = is_fixed
+            return is_fixed
 
         except Exception as e:
             self.logger.error(f"Error checking FixWireName attribute for connection {connection_id}: {e}")
             return False
 
-    def _unpack_id_tuple(self, result):
-        """Unpack an E3 (count, ids) getter result into a clean list of ids.
+    @staticmethod
+    def _unpack_ids(result):
+        """Unpack an E3 (count, ids) getter result into a clean tuple of ids.
 
         E3 array getters return (count, tuple_of_ids); tuple_of_ids may be a
         single value when there is exactly one. Filters out None and 0.
         """
-        if not result:
-            return []
-
-        if isinstance(result, tuple) and len(result) >= 2:
-            ids = result[1]
-            if isinstance(ids, tuple):
-                return [i for i in ids if i is not None and i != 0]
-            if ids is not None and ids != 0:
-                return [ids]
-            return []
-
-        self.logger.warning(f"Unexpected id-tuple format: {type(result)}")
-        return []
+        if not isinstance(result, tuple) or len(result) < 2:
+            return ()
+        ids = result[1]
+        if isinstance(ids, tuple):
+            return tuple(filter(None, ids))
+        return (ids,) if ids else ()
 
     def get_destination_sheet_ids(self, connection_ids):
         """Return the set of sheet IDs that carry a destination ("to") arrow.
@@ -380,12 +442,12 @@ class WireNumberAssigner:
 
         for connection_id in connection_ids:
             try:
-                self.connection.SetId(connection_id)
-                ref_symbol_ids = self._unpack_id_tuple(self.connection.GetReferenceSymbolIds())
+                self._select('connection', connection_id)
+                ref_symbol_ids = self._unpack_ids(self.connection.GetReferenceSymbolIds())
 
                 for sym_id in ref_symbol_ids:
                     try:
-                        self.symbol.SetId(sym_id)
+                        self._select('symbol', sym_id)
 
                         # Defensive guard: only reference (28) / arrow (1) symbols.
                         if self.symbol.GetSymbolType() not in (1, 28):
@@ -394,7 +456,7 @@ class WireNumberAssigner:
                         ref_info = self.symbol.GetSheetReferenceInfo()
                         # Expected shape: (retval, inout, type, refnam, signam)
                         if not isinstance(ref_info, tuple) or len(ref_info) < 2:
-                            self.logger.debug(f"Unexpected GetSheetReferenceInfo result for symbol {sym_id}: {ref_info}")
+                            self.logger.debug("Unexpected GetSheetReferenceInfo result for symbol %s: %s", sym_id, ref_info)
                             continue
 
                         retval, inout = ref_info[0], ref_info[1]
@@ -404,13 +466,13 @@ class WireNumberAssigner:
                         loc = self.symbol.GetSchemaLocation()
                         if isinstance(loc, tuple) and len(loc) >= 1 and loc[0] and loc[0] > 0:
                             destination_sheet_ids.add(loc[0])
-                            self.logger.debug(f"Destination ('to') arrow {sym_id} on sheet {loc[0]} (connection {connection_id})")
+                            self.logger.debug("Destination ('to') arrow %s on sheet %s (connection %s)", sym_id, loc[0], connection_id)
 
                     except Exception as e:
-                        self.logger.debug(f"Error inspecting reference symbol {sym_id} on connection {connection_id}: {e}")
+                        self.logger.debug("Error inspecting reference symbol %s on connection %s: %s", sym_id, connection_id, e)
 
             except Exception as e:
-                self.logger.debug(f"Error reading reference symbols for connection {connection_id}: {e}")
+                self.logger.debug("Error reading reference symbols for connection %s: %s", connection_id, e)
 
         return destination_sheet_ids
 
@@ -424,66 +486,70 @@ class WireNumberAssigner:
                 return
 
             # E3 API returns (count, tuple_of_ids)
-            actual_connections = []
-            if isinstance(connection_ids_result, tuple) and len(connection_ids_result) >= 2:
-                count = connection_ids_result[0]
-                connection_ids = connection_ids_result[1]
-
-                self.logger.info(f"E3 reports {count} connections")
-
-                if isinstance(connection_ids, tuple):
-                    # Filter out None values
-                    actual_connections = [cid for cid in connection_ids if cid is not None]
-                else:
-                    actual_connections = [connection_ids] if connection_ids is not None else []
-            else:
+            if not isinstance(connection_ids_result, tuple) or len(connection_ids_result) < 2:
                 self.logger.warning(f"Unexpected connection IDs format: {type(connection_ids_result)}")
                 return
 
+            self.logger.info(f"E3 reports {connection_ids_result[0]} connections")
+            # Drop repeated ids so no connection is read twice (order is kept)
+            actual_connections = list(dict.fromkeys(self._unpack_ids(connection_ids_result)))
+
             self.logger.info(f"Found {len(actual_connections)} valid connections to process")
 
-            # Group connections by signal name first
+            # Group connections by signal name, reading each connection's pins
+            # and net segments while it is selected for GetSignalName
             from collections import defaultdict
-            signal_connections = defaultdict(list)
+            signal_accum = defaultdict(lambda: {'wire_data': [], 'net_segments': set(), 'connection_ids': []})
 
-            # First pass: group all connections by signal name
-            for conn_id in actual_connections:
-                if conn_id is None:
-                    continue
+            select = self._select
+            load_connection = self._load_connection
 
+            for conn_id in actual_connections:
                 try:
+                    # Select the connection once for every read below (the net
+                    # and pin lookups use their own objects)
+                    select('connection', conn_id)
+
                     # Check if this connection has the FixWireName attribute set
-                    if self.has_fix_wire_name_attribute(conn_id):
-                        self.logger.info(f"Skipping connection {conn_id} - has FixWireName attribute set")
+                    if self._selected_connection_has_fix_wire_name(conn_id):
+                        self.logger.info("Skipping connection %s - has FixWireName attribute set", conn_id)
                         continue
 
-                    self.connection.SetId(conn_id)
-                    signal_name = self.connection.GetSignalName()
+                    connection_data = load_connection(conn_id)
+                    signal_name = connection_data['signal_name']
 
                     if signal_name:  # Only process connections with valid signal names
-                        signal_connections[signal_name].append(conn_id)
-                        self.logger.debug(f"Connection {conn_id} belongs to signal '{signal_name}'")
+                        accum = signal_accum[signal_name]
+                        accum['connection_ids'].append(conn_id)
+                        accum['net_segments'].update(connection_data['net_segment_ids'])
+                        self.logger.debug("Connection %s belongs to signal '%s'", conn_id, signal_name)
 
                 except Exception as e:
                     self.logger.error(f"Error getting signal name for connection {conn_id}: {e}")
 
-            # Second pass: calculate base wire number for each signal
-            signal_data = []
+            # Resolve every distinct pin's location in one contiguous pass
+            all_pin_ids = set()
+            for accum in signal_accum.values():
+                for conn_id in accum['connection_ids']:
+                    all_pin_ids.update(self._conn_cache[conn_id]['pin_ids'])
+            for pin_id in all_pin_ids:
+                self.get_pin_location_info(pin_id)
+
+            # Wire data now comes entirely from the connection and pin caches
+            for accum in signal_accum.values():
+                for conn_id in accum['connection_ids']:
+                    accum['wire_data'].extend(self._connection_wire_data(conn_id))
+
+            # Calculate base wire number for each signal, grouping signals by
+            # base wire number as they are resolved
+            wire_number_groups = defaultdict(list)
+            signal_count = 0
 
-            for signal_name, connection_ids in signal_connections.items():
+            for signal_name, accum in signal_accum.items():
                 try:
-                    # Collect all wire numbers and positions for this signal.
-                    all_wire_data = []
-                    all_net_segments = []
-
-                    for conn_id in connection_ids:
-                        # Get wire numbers and positions for this connection
-                        wire_data = self.get_connection_wire_numbers_and_positions(conn_id)
-                        all_wire_data.extend(wire_data)
-
-                        # Get all net segments for this connection
-                        net_segment_ids = self.get_net_segments_for_connection(conn_id)
-                        all_net_segments.extend(net_segment_ids)
+                    all_wire_data = accum['wire_data']
+                    all_net_segments = accum['net_segments']
+                    connection_ids = accum['connection_ids']
 
                     if all_wire_data:
                         # NA standards: the wire number must come from the net that
@@ -494,51 +560,49 @@ class WireNumberAssigner:
                         destination_sheet_ids = self.get_destination_sheet_ids(connection_ids)
                         origin_wire_data = [
                             wd for wd in all_wire_data
-                            if wd.get('sheet_id') not in destination_sheet_ids
+                            if wd.sheet_id not in destination_sheet_ids
                         ] if destination_sheet_ids else all_wire_data
 
                         candidate_wire_data = origin_wire_data if origin_wire_data else all_wire_data
                         if destination_sheet_ids and not origin_wire_data:
-                            self.logger.debug(f"Signal '{signal_name}' has no origin-side positions; falling back to all positions")
+                            self.logger.debug("Signal '%s' has no origin-side positions; falling back to all positions", signal_name)
                         elif destination_sheet_ids:
-                            self.logger.debug(f"Signal '{signal_name}' excluded continuation sheets {destination_sheet_ids} from wire-number selection")
+                            self.logger.debug("Signal '%s' excluded continuation sheets %s from wire-number selection", signal_name, destination_sheet_ids)
 
                         # Find the wire data with the lowest wire number for this signal
-                        # Use the same sorting logic as get_lowest_wire_number
-                        candidate_wire_data.sort(key=lambda x: self.wire_number_sort_key(x['wire_number']))
-                        lowest_wire_data = candidate_wire_data[0]
+                        # Use the same ordering as get_lowest_wire_number
+                        lowest_wire_data = min(candidate_wire_data, key=attrgetter('sort_key'))
 
-                        # Store signal data for later processing
-                        signal_data.append({
+                        # Store signal data under its base wire number
+                        wire_number_groups[lowest_wire_data.wire_number].append({
                             'signal_name': signal_name,
-                            'base_wire_number': lowest_wire_data['wire_number'],
-                            'x_coord': lowest_wire_data['x_coord'],
-                            'y_coord': lowest_wire_data['y_coord'],
-                            'net_segment_ids': list(set(all_net_segments)),  # Remove duplicates
+                            'base_wire_number': lowest_wire_data.wire_number,
+                            'x_coord': lowest_wire_data.x_coord,
+                            'y_coord': lowest_wire_data.y_coord,
+                            'net_segment_ids': all_net_segments,  # already deduplicated (set)
                             'connection_ids': connection_ids
                         })
+                        signal_count += 1
 
-                        self.logger.debug(f"Signal '{signal_name}' -> Base Wire: {lowest_wire_data['wire_number']}, X={lowest_wire_data['x_coord']}, Connections: {len(connection_ids)}, Net Segments: {len(set(all_net_segments))}")
+                        self.logger.debug("Signal '%s' -> Base Wire: %s, X=%s, Connections: %s, Net Segments: %s", signal_name, lowest_wire_data.wire_number, lowest_wire_data.x_coord, len(connection_ids), len(all_net_segments))
                     else:
                         self.logger.warning(f"Could not calculate wire number for signal '{signal_name}'")
 
                 except Exception as e:
                     self.logger.error(f"Error processing signal '{signal_name}': {e}")
 
-            # Group signals by base wire number
-            wire_number_groups = defaultdict(list)
-            for signal_info in signal_data:
-                wire_number_groups[signal_info['base_wire_number']].append(signal_info)
-
-            # Sort each group by X coordinate (left to right) then Y coordinate (top to bottom)
-            for base_wire_number, signals in wire_number_groups.items():
-                signals.sort(key=lambda x: (x['x_coord'], x['y_coord']))
-
             # Third pass: assign unique wire numbers to each signal
             updated_count = 0
+            unchanged_count = 0
             used_wire_numbers = set()
+            segment_wire_numbers = {}  # net segment id -> wire number
 
             for base_wire_number, signals in wire_number_groups.items():
+                # Order the group by X coordinate (left to right) then Y
+                # coordinate (top to bottom); most groups hold a single signal
+                if len(signals) > 1:
+                    signals.sort(key=itemgetter('x_coord', 'y_coord'))
+
                 for i, signal_info in enumerate(signals):
                     signal_name = signal_info['signal_name']
                     net_segment_ids = signal_info['net_segment_ids']
@@ -547,28 +611,50 @@ class WireNumberAssigner:
                     if i == 0:
                         # First signal at this position gets the base wire number
                         unique_wire_number = base_wire_number
-                    else:
+                    elif i <= len(_SUFFIXES):
                         # Subsequent signals get letter suffixes
-                        letter = chr(ord('A') + i - 1)
-                        unique_wire_number = f"{base_wire_number}.{letter}"
+                        unique_wire_number = f"{base_wire_number}.{_SUFFIXES[i - 1]}"
+                    else:
+                        # Out of two-letter suffixes; leave this signal unnumbered
+                        # rather than abort the writes for every other signal
+                        self.logger.error(f"Signal '{signal_name}' skipped: more than {len(_SUFFIXES) + 1} signals share base wire number {base_wire_number}")
+                        continue
 
                     used_wire_numbers.add(unique_wire_number)
 
-                    self.logger.info(f"Signal '{signal_name}' assigned unique wire number: {unique_wire_number} (X={signal_info['x_coord']}, Y={signal_info['y_coord']}, {len(net_segment_ids)} net segments)")
-
-                    # Set wire number for all net segments in this signal
-                    for net_segment_id in net_segment_ids:
-                        try:
-                            self.net_segment.SetId(net_segment_id)
-                            self.net_segment.SetAttributeValue("Wire number", unique_wire_number)
+                    self.logger.info("Signal '%s' assigned unique wire number: %s (X=%s, Y=%s, %s net segments)", signal_name, unique_wire_number, signal_info['x_coord'], signal_info['y_coord'], len(net_segment_ids))
+
+                    # Queue the wire number for all net segments in this signal
+                    # (a segment listed under several signals keeps the last one,
+                    # as it did when each signal wrote immediately)
+                    segment_wire_numbers.update(dict.fromkeys(net_segment_ids, unique_wire_number))
+
+            # Group the writes by value so each segment is written at most once
+            writes = defaultdict(list)  # wire number -> net segment ids
+            for net_segment_id, unique_wire_number in segment_wire_numbers.items():
+                writes[unique_wire_number].append(net_segment_id)
+
+            # Write the queued wire numbers, grouped by value; segments that
+            # already carry the right number are left untouched
+            select = self._select
+            get_segment_attr = self.net_segment.GetAttributeValue
+            set_segment_attr = self.net_segment.SetAttributeValue
+            for unique_wire_number, net_segment_ids in writes.items():
+                for net_segment_id in net_segment_ids:
+                    try:
+                        select('net_segment', net_segment_id)
+                        if get_segment_attr("Wire number") == unique_wire_number:
+                            unchanged_count += 1
+                        else:
+                            set_segment_attr("Wire number", unique_wire_number)
                             updated_count += 1
-                            self.logger.debug(f"Set wire number '{unique_wire_number}' for net segment {net_segment_id}")
+                            self.logger.debug("Set wire number '%s' for net segment %s", unique_wire_number, net_segment_id)
 
-                        except Exception as e:
-                            self.logger.error(f"Error setting wire number for net segment {net_segment_id}: {e}")
+                    except Exception as e:
+                        self.logger.error(f"Error setting wire number for net segment {net_segment_id}: {e}")
 
-            self.logger.info(f"Successfully updated wire numbers for {updated_count} net segments")
-            self.logger.info(f"Total signals processed: {len(signal_data)}")
+            self.logger.info(f"Successfully updated wire numbers for {updated_count} net segments ({unchanged_count} already up to date)")
+            self.logger.info(f"Total signals processed: {signal_count}")
             self.logger.info(f"Total unique wire numbers assigned: {len(used_wire_numbers)}")
 
         except Exception as e:
@@ -578,11 +664,18 @@ class WireNumberAssigner:
         """Main execution method"""
         self.logger.info("Starting wire number assignment process")
 
-        if not self.connect_to_e3():
-            self.logger.error("Failed to connect to E3. Make sure E3 is running with a project open.")
-            return False
+        # Start from fresh caches so edits made since the last run are seen
+        self._pin_loc_cache.clear()
+        self._sheet_name_cache.clear()
+        self._net_fix_cache.clear()
+        self._current_ids.clear()
+        self._conn_cache.clear()
 
         try:
+            if not self.connect_to_e3():
+                self.logger.error("Failed to connect to E3. Make sure E3 is running with a project open.")
+                return False
+
             self.process_connections()
             self.logger.info("Wire number assignment completed successfully")
             return True
@@ -598,24 +691,26 @@ class WireNumberAssigner:
             self.connection = None
             self.pin = None
             self.sheet = None
-            self.signal = None
             self.net = None
             self.net_segment = None
             self.symbol = None
-            # Uninitialize COM
-            try:
-                pythoncom.CoUninitialize()
-            except:
-                pass
+            # Release the connection we opened; a shared one (e3_objects) is
+            # released by its owner
+            if self._session is not None:
+                from .e3_connection_manager import release_e3_connection
+                release_e3_connection(self._session)
+                self._session = None
 
 
-def run_wire_number_automation(logger=None, e3_pid=None):
+def run_wire_number_automation(logger=None, e3_pid=None, e3_objects=None):
     """
     Main function to run wire number automation.
 
     Args:
         logger: Optional logger instance. If None, creates a default logger.
         e3_pid: Optional E3.series process ID. If None, will prompt user to select.
+        e3_objects: Optional objects dict from connect_to_e3_with_pid to reuse
+            instead of opening a new connection. The caller keeps ownership.
 
     Returns:
         bool: True if successful, False otherwise
@@ -632,7 +727,7 @@ def run_wire_number_automation(logger=None, e3_pid=None):
         )
         logger = logging.getLogger(__name__)
 
-    assigner = WireNumberAssigner(logger, e3_pid)
+    assigner = WireNumberAssigner(logger, e3_pid, e3_objects)
     success = assigner.run()
 
     if success:
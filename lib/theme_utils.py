@@ -8,6 +8,9 @@ import os
 import sys
 import customtkinter as ctk
 
+# The application directory (parent of lib/)
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 def get_theme_path(theme_name):
     """
     Get the absolute path to a theme file.
@@ -18,11 +21,8 @@ def get_theme_path(theme_name):
     Returns:
         str: The absolute path to the theme file
     """
-    # Get the application directory
-    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    
     # Construct the path to the theme file
-    theme_path = os.path.join(app_dir, "resources", "themes", f"{theme_name}.json")
+    theme_path = os.path.join(_APP_DIR, "resources", "themes", f"{theme_name}.json")
     
     # Check if the theme file exists
     if not os.path.exists(theme_path):
@@ -47,7 +47,12 @@ def apply_theme(theme_name="red", appearance_mode="dark"):
     
     # If the theme file exists, set it as the default color theme
     if theme_path:
-        ctk.set_default_color_theme(theme_path)
-    else:
-        # Fall back to a built-in theme
-        ctk.set_default_color_theme("blue")
+        try:
+            ctk.set_default_color_theme(theme_path)
+            return
+        except (OSError, ValueError, KeyError) as e:
+            # Unreadable or malformed theme JSON
+            print(f"Warning: Could not load theme {theme_path}: {e}. Using default theme.")
+
+    # Fall back to a built-in theme
+    ctk.set_default_color_theme("blue")